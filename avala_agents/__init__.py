@@ -1,6 +1,7 @@
 """avala-agents — build custom annotation workflow agents for the Avala platform."""
 
 from avala_agents._agent import TaskAgent
+from avala_agents._async_agent import AsyncTaskAgent
 from avala_agents._context import EventContext, ResultContext, TaskContext
 from avala_agents._exceptions import (
     AgentActionError,
@@ -12,6 +13,7 @@ from avala_agents._types import AgentEvent
 
 __all__ = [
     "TaskAgent",
+    "AsyncTaskAgent",
     "TaskContext",
     "ResultContext",
     "EventContext",
@@ -3,66 +3,23 @@
 from __future__ import annotations
 
 import logging
-import os
-from typing import Any, Callable
-from urllib.parse import urlparse
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
 
 import httpx
 
-from avala_agents._context import EventContext, ResultContext, TaskContext
-from avala_agents._exceptions import AgentActionError, AgentRegistrationError, AgentTimeoutError
+from avala_agents._base import _BaseAgent
+from avala_agents._exceptions import AgentActionError, AgentError, AgentRegistrationError, AgentTimeoutError
+from avala_agents._json import ExecutionParser, dumps
 from avala_agents._runner import PollingRunner
-from avala_agents._types import (
-    AGENT_EVENTS,
-    DATASET_EVENTS,
-    EXPORT_EVENTS,
-    RESULT_EVENTS,
-    TASK_EVENTS,
-    AgentEvent,
-)
-
-logger = logging.getLogger(__name__)
-
-_DEFAULT_BASE_URL = "https://api.avala.ai/api/v1"
-
-
-def _is_truthy(value: str | None) -> bool:
-    if not value:
-        return False
-    return value.strip().lower() in {"1", "true", "yes", "on"}
 
+if TYPE_CHECKING:
+    from typing_extensions import Self
 
-def _is_safe_localhost(hostname: str | None) -> bool:
-    return hostname in {"localhost", "127.0.0.1", "::1"}
-
-
-def _normalize_base_url(base_url: str) -> str:
-    """Validate and normalize a base URL.
-
-    HTTPS is required unless ``AVALA_ALLOW_INSECURE_BASE_URL`` is set, in
-    which case HTTP is permitted only for localhost. Prevents attacker-
-    controlled env vars from redirecting API-key-bearing traffic to
-    arbitrary hosts.
-    """
-    parsed = urlparse(base_url)
-    if not parsed.scheme or not parsed.netloc:
-        raise ValueError("Invalid base_url: expected a valid URL with scheme and host.")
-
-    allow_insecure = _is_truthy(os.environ.get("AVALA_ALLOW_INSECURE_BASE_URL"))
-    if parsed.scheme != "https":
-        if not allow_insecure:
-            raise ValueError(
-                "Base URL must use HTTPS. Set AVALA_ALLOW_INSECURE_BASE_URL=true only for local development."
-            )
-        if parsed.scheme != "http":
-            raise ValueError("With AVALA_ALLOW_INSECURE_BASE_URL=true, only http://localhost URLs are permitted.")
-        if not _is_safe_localhost(parsed.hostname):
-            raise ValueError("Non-HTTPS base URLs are allowed only for localhost addresses.")
-
-    return base_url.rstrip("/")
+logger = logging.getLogger(__name__)
 
 
-class TaskAgent:
+class TaskAgent(_BaseAgent):
     """
     An agent that processes annotation workflow events.
 
@@ -83,6 +40,11 @@ class TaskAgent:
         task_types: Optional list of task type identifiers to filter on.
         poll_interval: Seconds between polling requests when the queue
             is empty.
+        max_poll_interval: Upper bound for the wait between polls.  When
+            set, each consecutive empty poll waits 1.5x longer than the
+            last, up to this value, and the wait drops back to
+            ``poll_interval`` as soon as work arrives.  Defaults to
+            ``poll_interval`` (a fixed interval).
 
     Usage::
 
@@ -109,69 +71,23 @@ class TaskAgent:
         project: str | None = None,
         task_types: list[str] | None = None,
         poll_interval: float = 5.0,
+        max_poll_interval: float | None = None,
     ) -> None:
-        resolved_key = api_key or os.environ.get("AVALA_API_KEY", "")
-        if not resolved_key:
-            raise ValueError("No API key provided. Pass api_key= or set the AVALA_API_KEY environment variable.")
-        raw_url: str = base_url or os.environ.get("AVALA_BASE_URL") or _DEFAULT_BASE_URL
-        resolved_url = _normalize_base_url(raw_url) + "/"
-
-        self.name = name
-        self._project = project
-        self._task_types = task_types or []
-        self._poll_interval = poll_interval
-        self._base_url = resolved_url
-        self._handlers: dict[str, Callable[..., None]] = {}
-        self._agent_uid: str | None = None
-
-        self._http = httpx.Client(
-            base_url=resolved_url,
-            headers={
-                "X-Avala-Api-Key": resolved_key,
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-            },
-            timeout=30.0,
-            # Explicit — httpx defaults to False, but make the guarantee
-            # visible so a future maintainer can't silently enable redirects
-            # (which would leak X-Avala-Api-Key on cross-host 3xx).
-            follow_redirects=False,
+        super().__init__(
+            api_key=api_key,
+            base_url=base_url,
+            name=name,
+            project=project,
+            task_types=task_types,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
         )
+        self._http = httpx.Client(**self._client_kwargs)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def on(self, event: str) -> Callable[[Callable[..., None]], Callable[..., None]]:
-        """Decorator — register a handler for an agent event.
-
-        Args:
-            event: One of the supported event identifiers
-                (``"result.submitted"``, ``"result.accepted"``,
-                ``"result.rejected"``, ``"task.completed"``).
-
-        Returns:
-            The original handler function, unchanged.
-
-        Raises:
-            ValueError: If ``event`` is not a recognised event identifier.
-
-        Example::
-
-            @agent.on("result.submitted")
-            def handle(context):
-                context.approve()
-        """
-        if event not in AGENT_EVENTS:
-            raise ValueError(f"Unknown event '{event}'. Supported events: {', '.join(AGENT_EVENTS)}")
-
-        def decorator(func: Callable[..., None]) -> Callable[..., None]:
-            self._handlers[event] = func
-            logger.debug("Registered handler for '%s'.", event)
-            return func
-
-        return decorator
-
     def run(self) -> None:
         """Start the blocking polling loop.
 
@@ -180,7 +96,7 @@ class TaskAgent:
         ``Ctrl-C``.
         """
         self._register()
-        runner = PollingRunner(self, poll_interval=self._poll_interval)
+        runner = PollingRunner(self, poll_interval=self._poll_interval, max_poll_interval=self._max_poll_interval)
         runner.run()
 
     def run_once(self) -> int:
@@ -193,14 +109,14 @@ class TaskAgent:
             Number of executions processed.
         """
         self._register()
-        runner = PollingRunner(self, poll_interval=self._poll_interval)
+        runner = PollingRunner(self, poll_interval=self._poll_interval, max_poll_interval=self._max_poll_interval)
         return runner.run_once()
 
     def close(self) -> None:
         """Release the underlying HTTP connection pool."""
         self._http.close()
 
-    def __enter__(self) -> TaskAgent:
+    def __enter__(self) -> Self:
         return self
 
     def __exit__(self, *args: object) -> None:
@@ -213,49 +129,29 @@ class TaskAgent:
     def _register(self) -> None:
         """Register (or update) this agent on the server.
 
-        Idempotent — safe to call multiple times.  Sets
-        ``self._agent_uid`` on success.
+        Idempotent — safe to call multiple times; registers again only
+        if handlers were added since.  Sets ``self._agent_uid`` on
+        success.  The registration is cached on disk (under
+        ``$XDG_CACHE_HOME/avala-agents/``) so a restarted agent with the
+        same configuration sends a conditional request and reuses its
+        UID when the server answers ``304 Not Modified``.
 
         Raises:
             AgentRegistrationError: If the server returns a non-2xx
                 response.
         """
-        if self._agent_uid is not None:
-            return  # Already registered in this session.
-
-        payload: dict[str, Any] = {
-            "name": self.name,
-            "events": list(self._handlers.keys()),
-        }
-        if self._project:
-            payload["project"] = self._project
-        if self._task_types:
-            payload["task_types"] = self._task_types
+        if not self._needs_registration():
+            return  # Already registered with the current handlers.
 
+        request = self._registration_request()
         try:
-            response = self._http.post("agents/", json=payload)
+            response = self._http.post("agents/", content=request.body, headers=request.headers)
         except httpx.TimeoutException as exc:
             raise AgentTimeoutError(f"Timed out during registration: {exc}") from exc
         except httpx.HTTPError as exc:
             raise AgentRegistrationError(f"Network error during registration: {exc}") from exc
 
-        if not response.is_success:
-            raise AgentRegistrationError(
-                f"Failed to register agent '{self.name}': HTTP {response.status_code}",
-                status_code=response.status_code,
-            )
-
-        data = response.json()
-        self._agent_uid = data.get("uid")
-        if not self._agent_uid:
-            raise AgentRegistrationError(
-                f"Server returned success but no agent UID for '{self.name}'. Response: {data}",
-            )
-        logger.info(
-            "Agent '%s' registered (uid=%s).",
-            self.name,
-            self._agent_uid,
-        )
+        self._store_registration(response, request)
 
     def _fetch_pending_executions(self) -> list[dict[str, Any]]:
         """Poll the server for pending executions assigned to this agent.
@@ -266,36 +162,56 @@ class TaskAgent:
         """
         if not self._agent_uid:
             logger.warning("Cannot fetch executions — agent not registered.")
+            self._fetch_failed = True
             return []
-
-        params: dict[str, Any] = {"status": "pending"}
-        if self._project:
-            params["project"] = self._project
-        if self._task_types:
-            params["task_types"] = ",".join(self._task_types)
+        url = self._executions_url or self._prepare_poll()
 
         try:
-            response = self._http.get(
-                f"agents/{self._agent_uid}/executions/",
-                params=params,
-            )
+            response = self._http.get(url, timeout=self._poll_timeout)
         except httpx.HTTPError as exc:
             logger.error("Network error while fetching executions: %s", exc)
+            self._fetch_failed = True
             return []
 
-        if not response.is_success:
-            logger.error(
-                "Failed to fetch executions: HTTP %s",
-                response.status_code,
-            )
-            return []
+        return self._parse_executions(response)
+
+    def _iter_pending_executions(self) -> Iterator[dict[str, Any]]:
+        """Poll the server and yield pending executions as they are parsed.
+
+        Used by :meth:`run_once`.  With ijson installed the response body
+        is parsed as it streams in, so the first executions can be
+        dispatched before a large page has fully arrived.  Otherwise the
+        body is read and parsed whole.  The polling loop prefetches whole
+        pages instead, through :meth:`_fetch_pending_executions`: a single
+        ``loads`` is several times faster than ijson when nothing can be
+        dispatched before the page is complete.  The request never
+        long-polls, so :meth:`run_once` returns as soon as the current
+        page has been handled.
+        """
+        if not self._agent_uid:
+            logger.warning("Cannot fetch executions — agent not registered.")
+            self._fetch_failed = True
+            return
+        url = self._snapshot_url or self._prepare_poll(snapshot=True)
 
-        data: Any = response.json()
-        if isinstance(data, list):
-            return list(data)
-        if isinstance(data, dict):
-            return list(data.get("results", []))
-        return []
+        try:
+            with self._http.stream("GET", url) as response:
+                if not self._should_stream(response):
+                    response.read()
+                    yield from self._parse_executions(response)
+                    return
+                self._fetch_failed = False
+                parser = ExecutionParser()
+                try:
+                    for chunk in response.iter_bytes():
+                        yield from parser.feed(chunk)
+                    yield from parser.close()
+                except ValueError:
+                    self._fetch_failed = True
+                    raise
+        except httpx.HTTPError as exc:
+            logger.error("Network error while fetching executions: %s", exc)
+            self._fetch_failed = True
 
     def _dispatch(self, execution: dict[str, Any]) -> None:
         """Dispatch a single execution dict to its registered handler.
@@ -308,122 +224,115 @@ class TaskAgent:
         """
         execution_uid: str = execution.get("uid", "")
         event_type: str = execution.get("event_type", "")
-        payload: dict[str, Any] = execution.get("event_payload", {})
 
-        event = AgentEvent(
-            execution_uid=execution_uid,
-            event_type=event_type,
-            payload=payload,
-        )
+        route = self._routes.get(event_type)
+        if route is None:
+            reason = self._log_missing_handler(execution_uid, event_type)
+            self._submit_action(execution_uid, "skip", reason)
+            return
 
-        handler = self._handlers.get(event_type)
-        if handler is None:
-            reason = f"No handler registered for event type '{event_type}'"
-            logger.warning(
-                "No handler for event '%s' (execution %s) — skipping. "
-                "Register a handler with @agent.on('%s') to process these events.",
-                event_type,
+        handler, builder, _ = route
+        context = builder(execution_uid, event_type, execution.get("event_payload", {}), self)
+        # Checked per call (it is cached inside logging) so the handler
+        # name lookup and record building are skipped when DEBUG is off.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Dispatching execution '%s' (event=%s) to handler '%s'.",
                 execution_uid,
                 event_type,
+                handler.__name__,
             )
-            self._submit_action(execution_uid, "skip", reason)
-            return
+        queued = len(self._action_buffer)
+        try:
+            handler(context)
+        except BaseException:
+            # As in AsyncTaskAgent, decisions taken before the handler
+            # failed are discarded; the runner skips the execution instead.
+            del self._action_buffer[queued:]
+            raise
 
-        context = self._build_context(event)
-        logger.debug(
-            "Dispatching execution '%s' (event=%s) to handler '%s'.",
-            execution_uid,
-            event_type,
-            handler.__name__,
-        )
-        handler(context)
+    def _submit_action(self, execution_uid: str, action: str, reason: str) -> None:
+        """Submit an action decision to the server.
 
-    def _build_context(self, event: AgentEvent) -> ResultContext | TaskContext | EventContext:
-        """Build the appropriate context object for *event*.
+        Inside a poll iteration the action is queued and sent with the
+        rest of the batch by :meth:`_flush_batch`; otherwise it is
+        POSTed immediately.
 
         Args:
-            event: The raw :class:`AgentEvent` to wrap.
+            execution_uid: UID of the execution being resolved.
+            action: One of ``approve``, ``reject``, ``flag``, ``skip``.
+            reason: Human-readable explanation (may be empty).
 
-        Returns:
-            A :class:`ResultContext` for result events, a
-            :class:`TaskContext` for task events, or an
-            :class:`EventContext` for dataset/export events.
+        Raises:
+            AgentActionError: If the server returns a non-2xx response.
         """
-        p = event.payload
-
-        if event.event_type in RESULT_EVENTS:
-            return ResultContext(
-                execution_uid=event.execution_uid,
-                event_type=event.event_type,
-                task_uid=p.get("task_uid", ""),
-                result_uid=p.get("result_uid", ""),
-                result_data=p.get("result_data", []),
-                result_metadata=p.get("result_metadata", {}),
-                task_name=p.get("task_name"),
-                task_type=p.get("task_type"),
-                project_uid=p.get("project_uid"),
-                _agent=self,
-            )
+        if self._in_batch:
+            self._action_buffer.append((execution_uid, action, reason))
+            return
+        self._post_action(execution_uid, action, reason)
 
-        if event.event_type in TASK_EVENTS:
-            return TaskContext(
-                execution_uid=event.execution_uid,
-                event_type=event.event_type,
-                task_uid=p.get("task_uid", ""),
-                task_name=p.get("task_name"),
-                task_type=p.get("task_type"),
-                task_status=p.get("task_status"),
-                project_uid=p.get("project_uid"),
-                _agent=self,
-            )
+    def _flush_batch(self) -> None:
+        """Send the actions queued since :meth:`_begin_batch` in one request.
 
-        if event.event_type in DATASET_EVENTS or event.event_type in EXPORT_EVENTS:
-            return EventContext(
-                execution_uid=event.execution_uid,
-                event_type=event.event_type,
-                resource_uid=p.get("dataset_uid") or p.get("export_uid"),
-                resource_type=event.event_type.split(".")[0],
-                project_uid=p.get("project_uid"),
-                payload=p,
-                _agent=self,
-            )
+        If the bulk request fails, each action is POSTed individually so
+        one bad request does not lose the whole batch.  A server without
+        the bulk endpoint (``404``/``405``) is not sent bulk requests
+        again.  Failures are logged, not raised.
+        """
+        actions = self._take_batch()
+        if not actions:
+            return
 
-        # Fallback: generic EventContext for forward-compatibility.
-        logger.warning(
-            "Unrecognised event type '%s' — using generic EventContext. "
-            "Consider upgrading avala-agents to handle this event natively.",
-            event.event_type,
-        )
-        return EventContext(
-            execution_uid=event.execution_uid,
-            event_type=event.event_type,
-            resource_uid=None,
-            resource_type=None,
-            project_uid=p.get("project_uid"),
-            payload=p,
-            _agent=self,
-        )
+        if self._bulk_supported and self._post_bulk(actions):
+            return
 
-    def _submit_action(self, execution_uid: str, action: str, reason: str) -> None:
-        """POST an action decision to the server.
+        for execution_uid, action, reason in actions:
+            try:
+                self._post_action(execution_uid, action, reason)
+            # TypeError/ValueError: this action's reason cannot be encoded
+            # (e.g. a lone surrogate); the other actions still go out.
+            except (AgentError, TypeError, ValueError):
+                logger.warning(
+                    "Failed to submit action '%s' for execution '%s'.",
+                    action,
+                    execution_uid,
+                    exc_info=True,
+                )
+
+    def _post_bulk(self, actions: list[tuple[str, str, str]]) -> bool:
+        """POST *actions* in one bulk request.
 
-        Args:
-            execution_uid: UID of the execution being resolved.
-            action: One of ``approve``, ``reject``, ``flag``, ``skip``.
-            reason: Human-readable explanation (may be empty).
+        Returns:
+            ``True`` if the server accepted them.  Failures, including an
+            action that cannot be encoded, are logged and return ``False``
+            so the caller can fall back to per-action requests.
+        """
+        try:
+            content = dumps(self._bulk_payload(actions))
+        except (TypeError, ValueError) as exc:
+            self._log_bulk_failure(exc, len(actions))
+            return False
+        try:
+            response = self._http.post(self._bulk_action_url, content=content)
+        except httpx.HTTPError as exc:
+            self._log_bulk_failure(exc, len(actions))
+            return False
+        if response.is_success:
+            logger.debug("Submitted %d action(s) in bulk.", len(actions))
+            return True
+        self._handle_bulk_error(response, len(actions))
+        return False
+
+    def _post_action(self, execution_uid: str, action: str, reason: str) -> None:
+        """POST a single action decision to the server.
 
         Raises:
             AgentActionError: If the server returns a non-2xx response.
         """
-        payload: dict[str, Any] = {
-            "execution": execution_uid,
-            "action": action,
-        }
-        if reason:
-            payload["reason"] = reason
+        payload = self._action_payload(execution_uid, action, reason)
 
         try:
-            response = self._http.post("agent-actions/", json=payload)
+            response = self._http.post(self._action_url, content=dumps(payload))
         except httpx.TimeoutException as exc:
             raise AgentTimeoutError(
                 f"Timed out while submitting action '{action}' for execution '{execution_uid}': {exc}"
@@ -433,14 +342,4 @@ class TaskAgent:
                 f"Network error while submitting action '{action}' for execution '{execution_uid}': {exc}"
             ) from exc
 
-        if not response.is_success:
-            raise AgentActionError(
-                f"Failed to submit action '{action}' for execution '{execution_uid}': HTTP {response.status_code}",
-                status_code=response.status_code,
-            )
-
-        logger.debug(
-            "Action '%s' submitted for execution '%s'.",
-            action,
-            execution_uid,
-        )
+        self._check_action_response(response, execution_uid, action)
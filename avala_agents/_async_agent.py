@@ -0,0 +1,319 @@
+"""AsyncTaskAgent — asyncio variant of :class:`TaskAgent`."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from avala_agents._base import _BaseAgent
+from avala_agents._exceptions import AgentActionError, AgentError, AgentRegistrationError, AgentTimeoutError
+from avala_agents._json import ExecutionParser, dumps
+from avala_agents._runner import AsyncPollingRunner
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTaskAgent(_BaseAgent):
+    """
+    An agent that processes annotation workflow events on an asyncio
+    event loop.
+
+    Takes the same arguments as :class:`TaskAgent`.  Handlers may be
+    coroutine functions or plain functions; plain functions run in a
+    worker thread so a blocking handler does not stall the event loop.
+    Executions from one poll are dispatched concurrently.  Context actions
+    (``approve``/``reject``/``flag``/``skip``) are recorded while the
+    handler runs and submitted once it returns; if the handler raises,
+    the recorded actions are discarded and the execution is skipped.
+
+    Usage::
+
+        import asyncio
+
+        from avala_agents import AsyncTaskAgent
+
+        agent = AsyncTaskAgent(api_key="avk_...", name="quality-checker")
+
+        @agent.on("result.submitted")
+        async def check(context):
+            if not context.result_data:
+                context.reject("No annotations found")
+            else:
+                context.approve()
+
+        async def main():
+            async with agent:
+                await agent.run()
+
+        asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        name: str = "default-agent",
+        project: str | None = None,
+        task_types: list[str] | None = None,
+        poll_interval: float = 5.0,
+        max_poll_interval: float | None = None,
+    ) -> None:
+        super().__init__(
+            api_key=api_key,
+            base_url=base_url,
+            name=name,
+            project=project,
+            task_types=task_types,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+        )
+        self._http = httpx.AsyncClient(**self._client_kwargs)
+        # Actions recorded by context objects, keyed by the UID of each
+        # execution currently being dispatched.
+        self._pending_actions: dict[str, list[tuple[str, str]]] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def run(self) -> None:
+        """Run the polling loop until the task is cancelled.
+
+        Registers the agent with the server on first call, then polls
+        indefinitely for pending executions.
+        """
+        await self._register()
+        runner = AsyncPollingRunner(self, poll_interval=self._poll_interval, max_poll_interval=self._max_poll_interval)
+        await runner.run()
+
+    async def run_once(self) -> int:
+        """Process all currently pending executions once.
+
+        Returns:
+            Number of executions processed.
+        """
+        await self._register()
+        runner = AsyncPollingRunner(self, poll_interval=self._poll_interval, max_poll_interval=self._max_poll_interval)
+        return await runner.run_once()
+
+    async def aclose(self) -> None:
+        """Release the underlying HTTP connection pool."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.aclose()
+
+    # ------------------------------------------------------------------
+    # Internal helpers called by AsyncPollingRunner and context objects
+    # ------------------------------------------------------------------
+
+    async def _register(self) -> None:
+        """Register this agent on the server.  See :meth:`TaskAgent._register`."""
+        if not self._needs_registration():
+            return  # Already registered with the current handlers.
+
+        request = self._registration_request()
+        try:
+            response = await self._http.post("agents/", content=request.body, headers=request.headers)
+        except httpx.TimeoutException as exc:
+            raise AgentTimeoutError(f"Timed out during registration: {exc}") from exc
+        except httpx.HTTPError as exc:
+            raise AgentRegistrationError(f"Network error during registration: {exc}") from exc
+
+        self._store_registration(response, request)
+
+    async def _fetch_pending_executions(self) -> list[dict[str, Any]]:
+        """Poll the server for pending executions assigned to this agent.
+
+        See :meth:`TaskAgent._fetch_pending_executions`.
+        """
+        if not self._agent_uid:
+            logger.warning("Cannot fetch executions — agent not registered.")
+            self._fetch_failed = True
+            return []
+        url = self._executions_url or self._prepare_poll()
+
+        try:
+            response = await self._http.get(url, timeout=self._poll_timeout)
+        except httpx.HTTPError as exc:
+            logger.error("Network error while fetching executions: %s", exc)
+            self._fetch_failed = True
+            return []
+
+        return self._parse_executions(response)
+
+    async def _iter_pending_executions(self) -> AsyncIterator[dict[str, Any]]:
+        """Poll the server and yield pending executions as they are parsed.
+
+        See :meth:`TaskAgent._iter_pending_executions`.
+        """
+        if not self._agent_uid:
+            logger.warning("Cannot fetch executions — agent not registered.")
+            self._fetch_failed = True
+            return
+        url = self._snapshot_url or self._prepare_poll(snapshot=True)
+
+        try:
+            async with self._http.stream("GET", url) as response:
+                if not self._should_stream(response):
+                    await response.aread()
+                    for execution in self._parse_executions(response):
+                        yield execution
+                    return
+                self._fetch_failed = False
+                parser = ExecutionParser()
+                try:
+                    async for chunk in response.aiter_bytes():
+                        for execution in parser.feed(chunk):
+                            yield execution
+                    for execution in parser.close():
+                        yield execution
+                except ValueError:
+                    self._fetch_failed = True
+                    raise
+        except httpx.HTTPError as exc:
+            logger.error("Network error while fetching executions: %s", exc)
+            self._fetch_failed = True
+
+    async def _dispatch(self, execution: dict[str, Any]) -> None:
+        """Dispatch a single execution dict to its registered handler.
+
+        Actions recorded by the handler are submitted after it returns.
+
+        Args:
+            execution: Raw execution payload from the API.
+        """
+        execution_uid: str = execution.get("uid", "")
+        event_type: str = execution.get("event_type", "")
+
+        route = self._routes.get(event_type)
+        if route is None:
+            reason = self._log_missing_handler(execution_uid, event_type)
+            await self._queue_action(execution_uid, "skip", reason)
+            return
+
+        handler, builder, is_coroutine = route
+        context = builder(execution_uid, event_type, execution.get("event_payload", {}), self)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Dispatching execution '%s' (event=%s) to handler '%s'.",
+                execution_uid,
+                event_type,
+                handler.__name__,
+            )
+        self._pending_actions[execution_uid] = []
+        try:
+            if is_coroutine:
+                await handler(context)
+            else:
+                result = await asyncio.to_thread(handler, context)
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            actions = self._pending_actions.pop(execution_uid)
+
+        for action, reason in actions:
+            await self._queue_action(execution_uid, action, reason)
+
+    def _submit_action(self, execution_uid: str, action: str, reason: str) -> None:
+        """Record an action decision; it is submitted when the handler returns.
+
+        Decisions can only be taken while the execution's handler runs.
+        A context used after its handler returned has nothing to submit
+        the action with, so the action is dropped with a warning.
+        """
+        actions = self._pending_actions.get(execution_uid)
+        if actions is None:
+            logger.warning(
+                "Dropping '%s' action for execution '%s': its handler is no longer running.",
+                action,
+                execution_uid,
+            )
+            return
+        actions.append((action, reason))
+
+    async def _queue_action(self, execution_uid: str, action: str, reason: str) -> None:
+        """Queue an action for the current batch, or POST it outside one."""
+        if self._in_batch:
+            self._action_buffer.append((execution_uid, action, reason))
+            return
+        await self._post_action(execution_uid, action, reason)
+
+    async def _flush_batch(self) -> None:
+        """Send the queued actions in one request.  See :meth:`TaskAgent._flush_batch`."""
+        actions = self._take_batch()
+        if not actions:
+            return
+
+        if self._bulk_supported and await self._post_bulk(actions):
+            return
+
+        for execution_uid, action, reason in actions:
+            try:
+                await self._post_action(execution_uid, action, reason)
+            # TypeError/ValueError: this action's reason cannot be encoded
+            # (e.g. a lone surrogate); the other actions still go out.
+            except (AgentError, TypeError, ValueError):
+                logger.warning(
+                    "Failed to submit action '%s' for execution '%s'.",
+                    action,
+                    execution_uid,
+                    exc_info=True,
+                )
+
+    async def _post_bulk(self, actions: list[tuple[str, str, str]]) -> bool:
+        """POST *actions* in one bulk request.
+
+        Returns:
+            ``True`` if the server accepted them.  Failures, including an
+            action that cannot be encoded, are logged and return ``False``
+            so the caller can fall back to per-action requests.
+        """
+        try:
+            content = dumps(self._bulk_payload(actions))
+        except (TypeError, ValueError) as exc:
+            self._log_bulk_failure(exc, len(actions))
+            return False
+        try:
+            response = await self._http.post(self._bulk_action_url, content=content)
+        except httpx.HTTPError as exc:
+            self._log_bulk_failure(exc, len(actions))
+            return False
+        if response.is_success:
+            logger.debug("Submitted %d action(s) in bulk.", len(actions))
+            return True
+        self._handle_bulk_error(response, len(actions))
+        return False
+
+    async def _post_action(self, execution_uid: str, action: str, reason: str) -> None:
+        """POST an action decision to the server.
+
+        Raises:
+            AgentActionError: If the server returns a non-2xx response.
+        """
+        payload = self._action_payload(execution_uid, action, reason)
+
+        try:
+            response = await self._http.post(self._action_url, content=dumps(payload))
+        except httpx.TimeoutException as exc:
+            raise AgentTimeoutError(
+                f"Timed out while submitting action '{action}' for execution '{execution_uid}': {exc}"
+            ) from exc
+        except httpx.HTTPError as exc:
+            raise AgentActionError(
+                f"Network error while submitting action '{action}' for execution '{execution_uid}': {exc}"
+            ) from exc
+
+        self._check_action_response(response, execution_uid, action)
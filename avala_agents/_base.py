@@ -0,0 +1,520 @@
+"""Configuration and dispatch logic shared by the sync and async agents."""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import inspect
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+import httpx
+
+from avala_agents._dispatch import _BUILDERS, _ContextBuilder, _HandlerContext, build_context
+from avala_agents._exceptions import AgentActionError, AgentRegistrationError
+from avala_agents._json import STREAMING_AVAILABLE, dumps, loads
+from avala_agents._types import _AGENT_EVENT_SET, AGENT_EVENTS
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BASE_URL = "https://api.avala.ai/api/v1"
+
+_REQUEST_TIMEOUT = 30.0
+
+# Idle connections are kept for at least this long.  httpx defaults to 5s,
+# which equals the default poll interval and forces a fresh TCP+TLS
+# handshake on every poll.
+_KEEPALIVE_EXPIRY = 30.0
+
+# Idle connections kept in the pool.  Also caps how many executions the
+# async runner dispatches at once, so a burst never outgrows the pool.
+_MAX_KEEPALIVE_CONNECTIONS = 20
+
+# Seconds the server may hold an executions request open waiting for work,
+# when it advertises long-poll support at registration.
+_LONG_POLL_WAIT = 30.0
+_LONG_POLL_HEADER = "X-Avala-Long-Poll"
+
+# Answers to ``POST /agent-actions/bulk/`` meaning the server has no bulk
+# endpoint; the agent then submits actions individually from then on.
+_BULK_UNSUPPORTED_STATUSES = frozenset({404, 405})
+
+# Registrations are cached on disk so a restarted agent with unchanged
+# handlers can ask the server to confirm its previous UID.
+_CACHE_DIR_NAME = "avala-agents"
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+# HTTP/2 needs the optional ``h2`` package (``pip install avala-agents[http2]``).
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _is_truthy(value: str | None) -> bool:
+    if not value:
+        return False
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _is_safe_localhost(hostname: str | None) -> bool:
+    return hostname in {"localhost", "127.0.0.1", "::1"}
+
+
+def _normalize_base_url(base_url: str) -> str:
+    """Validate and normalize a base URL.
+
+    HTTPS is required unless ``AVALA_ALLOW_INSECURE_BASE_URL`` is set, in
+    which case HTTP is permitted only for localhost. Prevents attacker-
+    controlled env vars from redirecting API-key-bearing traffic to
+    arbitrary hosts.
+    """
+    parsed = urlparse(base_url)
+    if not parsed.scheme or not parsed.netloc:
+        raise ValueError("Invalid base_url: expected a valid URL with scheme and host.")
+
+    allow_insecure = _is_truthy(os.environ.get("AVALA_ALLOW_INSECURE_BASE_URL"))
+    if parsed.scheme != "https":
+        if not allow_insecure:
+            raise ValueError(
+                "Base URL must use HTTPS. Set AVALA_ALLOW_INSECURE_BASE_URL=true only for local development."
+            )
+        if parsed.scheme != "http":
+            raise ValueError("With AVALA_ALLOW_INSECURE_BASE_URL=true, only http://localhost URLs are permitted.")
+        if not _is_safe_localhost(parsed.hostname):
+            raise ValueError("Non-HTTPS base URLs are allowed only for localhost addresses.")
+
+    return base_url.rstrip("/")
+
+
+def _registration_cache_dir() -> Path:
+    """Return the registration cache directory, honouring ``XDG_CACHE_HOME``."""
+    xdg_cache = os.environ.get("XDG_CACHE_HOME", "")
+    root = Path(xdg_cache) if os.path.isabs(xdg_cache) else Path.home() / ".cache"
+    return root / _CACHE_DIR_NAME
+
+
+@dataclass
+class _RegistrationRequest:
+    """A prepared ``POST /agents/`` request."""
+
+    body: bytes
+    fingerprint: str
+    # The cached registration matching ``fingerprint``, if there is one.
+    cached: dict[str, Any] | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def _build_limits(poll_interval: float) -> httpx.Limits:
+    """Return connection pool limits that keep the poll connection alive.
+
+    ``keepalive_expiry`` is never shorter than ``poll_interval`` so the
+    pool does not drop the idle connection between two polls.
+    """
+    return httpx.Limits(
+        max_connections=100,
+        max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=max(_KEEPALIVE_EXPIRY, poll_interval + 5.0),
+    )
+
+
+class _BaseAgent(ABC):
+    """State and logic common to :class:`TaskAgent` and :class:`AsyncTaskAgent`.
+
+    Subclasses own the HTTP client and implement the network calls;
+    everything that does not touch the network lives here.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        name: str = "default-agent",
+        project: str | None = None,
+        task_types: list[str] | None = None,
+        poll_interval: float = 5.0,
+        max_poll_interval: float | None = None,
+    ) -> None:
+        resolved_key = api_key or os.environ.get("AVALA_API_KEY", "")
+        if not resolved_key:
+            raise ValueError("No API key provided. Pass api_key= or set the AVALA_API_KEY environment variable.")
+        raw_url: str = base_url or os.environ.get("AVALA_BASE_URL") or _DEFAULT_BASE_URL
+        resolved_url = _normalize_base_url(raw_url) + "/"
+
+        self.name = name
+        self._project = project
+        self._task_types = task_types or []
+        self._poll_interval = poll_interval
+        self._max_poll_interval = max(poll_interval, max_poll_interval or 0.0)
+        self._base_url = resolved_url
+        self._handlers: dict[str, Callable[..., Any]] = {}
+        # Event type -> (handler, context builder, whether the handler is a
+        # coroutine function), resolved once in on() so dispatch does a
+        # single lookup and no per-call introspection.
+        self._routes: dict[str, tuple[Callable[..., Any], _ContextBuilder, bool]] = {}
+        self._agent_uid: str | None = None
+        # Set until registration succeeds, and again when on() adds an
+        # event, so _register() knows to (re-)register without comparing
+        # the event sets on every call.
+        self._registration_stale = True
+        # (serialized body, fingerprint) of the registration request,
+        # built by _registration_request() and dropped by on() when the
+        # event set changes.
+        self._registration_body: tuple[bytes, str] | None = None
+        # Part of the registration fingerprint, so a cached UID is never
+        # reused under another account's key.  Only a digest is kept.
+        self._api_key_digest = hashlib.blake2b(resolved_key.encode(), digest_size=8).digest()
+        # Set at registration when the server supports ``?wait=``.
+        self._long_poll = False
+        # Whether the most recent executions fetch failed (network or
+        # non-2xx); the runner backs off instead of polling again at once.
+        self._fetch_failed = False
+        # Absolute URLs, parsed once.  A relative URL is re-parsed and
+        # joined with the client's base_url on every request, which
+        # dominates httpx's per-request overhead.
+        self._action_url = httpx.URL(resolved_url + "agent-actions/")
+        self._bulk_action_url = httpx.URL(resolved_url + "agent-actions/bulk/")
+        # Built by _prepare_poll() once the agent UID is known.  The
+        # snapshot URL never long-polls, so run_once() returns promptly.
+        self._executions_url: httpx.URL | None = None
+        self._snapshot_url: httpx.URL | None = None
+        self._poll_timeout = httpx.Timeout(_REQUEST_TIMEOUT)
+        # Actions queued while a poll iteration is being processed; the
+        # runner flushes them in one bulk request.  Outside a batch,
+        # actions are POSTed individually.
+        self._in_batch = False
+        self._action_buffer: list[tuple[str, str, str]] = []
+        # Cleared when the server answers the bulk endpoint with 404/405,
+        # so later batches skip the doomed bulk request.
+        self._bulk_supported = True
+
+        # Keyword arguments shared by the sync and async httpx clients.
+        self._client_kwargs: dict[str, Any] = {
+            "base_url": resolved_url,
+            "headers": {
+                "X-Avala-Api-Key": resolved_key,
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+            "timeout": _REQUEST_TIMEOUT,
+            "limits": _build_limits(self._max_poll_interval),
+            "http2": _HTTP2_AVAILABLE,
+            # Explicit — httpx defaults to False, but make the guarantee
+            # visible so a future maintainer can't silently enable redirects
+            # (which would leak X-Avala-Api-Key on cross-host 3xx).
+            "follow_redirects": False,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def on(self, event: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator — register a handler for an agent event.
+
+        Args:
+            event: One of the supported event identifiers
+                (``"result.submitted"``, ``"result.accepted"``,
+                ``"result.rejected"``, ``"task.completed"``).
+
+        Returns:
+            The original handler function, unchanged.
+
+        Raises:
+            ValueError: If ``event`` is not a recognised event identifier.
+
+        Example::
+
+            @agent.on("result.submitted")
+            def handle(context):
+                context.approve()
+        """
+        if event not in _AGENT_EVENT_SET:
+            raise ValueError(f"Unknown event '{event}'. Supported events: {', '.join(AGENT_EVENTS)}")
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            if event not in self._handlers:
+                self._registration_stale = True
+                self._registration_body = None
+            self._handlers[event] = func
+            self._routes[event] = (func, _BUILDERS[event], inspect.iscoroutinefunction(func))
+            logger.debug("Registered handler for '%s'.", event)
+            return func
+
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def _submit_action(self, execution_uid: str, action: str, reason: str) -> None:
+        """Submit an action decision for an execution.
+
+        Called by the context objects; implemented by each agent.
+        """
+
+    def _registration_payload(self, events: tuple[str, ...]) -> dict[str, Any]:
+        """Return the JSON body for ``POST /agents/``."""
+        payload: dict[str, Any] = {
+            "name": self.name,
+            "events": list(events),
+        }
+        if self._project:
+            payload["project"] = self._project
+        if self._task_types:
+            payload["task_types"] = self._task_types
+        return payload
+
+    def _needs_registration(self) -> bool:
+        """Return whether the agent is unregistered or its handlers changed."""
+        return self._registration_stale or self._agent_uid is None
+
+    def _registration_request(self) -> _RegistrationRequest:
+        """Prepare the registration request.
+
+        The body is fingerprinted together with the base URL and the API
+        key.  If the disk cache holds a registration with the same
+        fingerprint, the request carries it as ``If-None-Match`` so the
+        server can answer ``304`` and the cached UID is reused.
+        """
+        # The serialized body only depends on the subscribed events, so it
+        # is rebuilt (and the events sorted) only after on() adds one; a
+        # retry after a failed registration reuses it.
+        if self._registration_body is None:
+            body = dumps(self._registration_payload(tuple(sorted(self._handlers))))
+            fingerprint = hashlib.blake2b(
+                self._base_url.encode() + self._api_key_digest + body,
+                digest_size=8,
+            ).hexdigest()
+            self._registration_body = (body, fingerprint)
+        body, fingerprint = self._registration_body
+        request = _RegistrationRequest(body=body, fingerprint=fingerprint)
+
+        cached = self._load_registration_cache()
+        if cached is not None and cached.get("fingerprint") == fingerprint and cached.get("uid"):
+            request.cached = cached
+            request.headers["If-None-Match"] = f'"{fingerprint}"'
+        return request
+
+    def _store_registration(self, response: httpx.Response, request: _RegistrationRequest) -> None:
+        """Record the agent UID from a registration response.
+
+        A ``304`` answer to a conditional request reuses the cached UID.
+
+        Raises:
+            AgentRegistrationError: If the server returned a non-2xx
+                response or no agent UID.
+        """
+        long_poll_header = response.headers.get(_LONG_POLL_HEADER)
+        if response.status_code == 304 and request.cached is not None:
+            self._agent_uid = request.cached["uid"]
+            if long_poll_header is None:
+                self._long_poll = bool(request.cached.get("long_poll"))
+            else:
+                self._long_poll = _is_truthy(long_poll_header)
+        else:
+            if not response.is_success:
+                raise AgentRegistrationError(
+                    f"Failed to register agent '{self.name}': HTTP {response.status_code}",
+                    status_code=response.status_code,
+                )
+
+            data = loads(response.content)
+            self._agent_uid = data.get("uid")
+            if not self._agent_uid:
+                raise AgentRegistrationError(
+                    f"Server returned success but no agent UID for '{self.name}'. Response: {data}",
+                )
+            self._long_poll = _is_truthy(long_poll_header)
+            self._save_registration_cache(request.fingerprint)
+
+        self._registration_stale = False
+        self._prepare_poll()
+        logger.info(
+            "Agent '%s' registered (uid=%s, long_poll=%s, cached=%s).",
+            self.name,
+            self._agent_uid,
+            self._long_poll,
+            response.status_code == 304,
+        )
+
+    def _registration_cache_path(self) -> Path:
+        """Return the file caching this agent's registration."""
+        filename = _UNSAFE_FILENAME_CHARS.sub("_", self.name) + ".json"
+        return _registration_cache_dir() / filename
+
+    def _load_registration_cache(self) -> dict[str, Any] | None:
+        """Read the cached registration, or ``None`` if there is none."""
+        path = self._registration_cache_path()
+        try:
+            data = loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.debug("Ignoring unreadable registration cache '%s'.", path, exc_info=True)
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _save_registration_cache(self, fingerprint: str) -> None:
+        """Cache the current registration.  Failures are logged, not raised."""
+        path = self._registration_cache_path()
+        entry = {"fingerprint": fingerprint, "uid": self._agent_uid, "long_poll": self._long_poll}
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(dumps(entry))
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.debug("Could not write registration cache '%s'.", path, exc_info=True)
+
+    @staticmethod
+    def _action_payload(execution_uid: str, action: str, reason: str) -> dict[str, Any]:
+        """Return the JSON body for ``POST /agent-actions/``."""
+        payload: dict[str, Any] = {
+            "execution": execution_uid,
+            "action": action,
+        }
+        if reason:
+            payload["reason"] = reason
+        return payload
+
+    def _begin_batch(self) -> None:
+        """Start queueing actions instead of POSTing them one by one."""
+        self._in_batch = True
+
+    def _take_batch(self) -> list[tuple[str, str, str]]:
+        """End the current batch and return the queued actions."""
+        self._in_batch = False
+        actions, self._action_buffer = self._action_buffer, []
+        return actions
+
+    @classmethod
+    def _bulk_payload(cls, actions: list[tuple[str, str, str]]) -> dict[str, Any]:
+        """Return the JSON body for ``POST /agent-actions/bulk/``."""
+        return {"actions": [cls._action_payload(*action) for action in actions]}
+
+    @staticmethod
+    def _log_bulk_failure(detail: object, count: int) -> None:
+        logger.warning(
+            "Bulk action submission failed (%s) — submitting %d action(s) individually.",
+            detail,
+            count,
+        )
+
+    def _handle_bulk_error(self, response: httpx.Response, count: int) -> None:
+        """Log a non-2xx bulk response; stop using the endpoint if the server lacks it."""
+        if response.status_code in _BULK_UNSUPPORTED_STATUSES:
+            self._bulk_supported = False
+            logger.info(
+                "Server does not support bulk action submission (HTTP %s) — submitting actions individually.",
+                response.status_code,
+            )
+            return
+        self._log_bulk_failure(f"HTTP {response.status_code}", count)
+
+    @staticmethod
+    def _check_action_response(response: httpx.Response, execution_uid: str, action: str) -> None:
+        """Raise :class:`AgentActionError` unless *response* is a 2xx."""
+        if not response.is_success:
+            raise AgentActionError(
+                f"Failed to submit action '{action}' for execution '{execution_uid}': HTTP {response.status_code}",
+                status_code=response.status_code,
+            )
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Action '%s' submitted for execution '%s'.",
+                action,
+                execution_uid,
+            )
+
+    def _prepare_poll(self, snapshot: bool = False) -> httpx.URL:
+        """Precompute the URL, query parameters and timeout of every poll.
+
+        None of them change between polls, so they are built once after
+        registration instead of on each request; the query is folded into
+        an absolute URL that httpx uses as is.  A long-poll request may
+        legitimately stay silent for up to ``_LONG_POLL_WAIT`` seconds,
+        so its read timeout is raised accordingly.  The snapshot URL used
+        by ``run_once()`` carries the same query without ``wait`` and is
+        sent with the client's default timeout.
+
+        Args:
+            snapshot: Return the snapshot URL instead of the polling one.
+
+        Returns:
+            The executions URL.
+        """
+        params: dict[str, Any] = {"status": "pending"}
+        if self._project:
+            params["project"] = self._project
+        if self._task_types:
+            params["task_types"] = ",".join(self._task_types)
+        if self._long_poll:
+            params["wait"] = int(_LONG_POLL_WAIT)
+            self._poll_timeout = httpx.Timeout(_REQUEST_TIMEOUT, read=_LONG_POLL_WAIT + 5.0)
+        else:
+            self._poll_timeout = httpx.Timeout(_REQUEST_TIMEOUT)
+        url = f"{self._base_url}agents/{self._agent_uid}/executions/"
+        self._executions_url = httpx.URL(url, params=params)
+        params.pop("wait", None)
+        self._snapshot_url = httpx.URL(url, params=params)
+        return self._snapshot_url if snapshot else self._executions_url
+
+    @staticmethod
+    def _should_stream(response: httpx.Response) -> bool:
+        """Return whether to parse an executions *response* incrementally.
+
+        Error responses are always read whole so :meth:`_parse_executions`
+        can log them.
+        """
+        return STREAMING_AVAILABLE and response.is_success
+
+    def _parse_executions(self, response: httpx.Response) -> list[dict[str, Any]]:
+        """Extract the execution list from an executions response."""
+        self._fetch_failed = not response.is_success
+        if not response.is_success:
+            logger.error(
+                "Failed to fetch executions: HTTP %s",
+                response.status_code,
+            )
+            return []
+
+        data: Any = loads(response.content)
+        if isinstance(data, list):
+            return list(data)
+        if isinstance(data, dict):
+            return list(data.get("results", []))
+        return []
+
+    def _build_context(self, execution_uid: str, event_type: str, payload: dict[str, Any]) -> _HandlerContext:
+        """Build the appropriate context object for an execution.
+
+        Args:
+            execution_uid: UID of the execution.
+            event_type: The execution's event identifier.
+            payload: The execution's ``event_payload``.
+
+        Returns:
+            A :class:`ResultContext` for result events, a
+            :class:`TaskContext` for task events, or an
+            :class:`EventContext` for dataset/export events.
+        """
+        return build_context(execution_uid, event_type, payload, self)
+
+    @staticmethod
+    def _log_missing_handler(execution_uid: str, event_type: str) -> str:
+        """Log the auto-skip warning and return the skip reason."""
+        logger.warning(
+            "No handler for event '%s' (execution %s) — skipping. "
+            "Register a handler with @agent.on('%s') to process these events.",
+            event_type,
+            execution_uid,
+            event_type,
+        )
+        return f"No handler registered for event type '{event_type}'"
@@ -2,14 +2,31 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass, fields
+from typing import Any, Protocol
 
-if TYPE_CHECKING:
-    from avala_agents._agent import TaskAgent
 
+class _ActionSubmitter(Protocol):
+    """The part of an agent a context needs."""
 
-@dataclass
+    def _submit_action(self, execution_uid: str, action: str, reason: str) -> None: ...
+
+
+# One context is built per dispatched execution; slots drop the per-instance
+# ``__dict__`` (~half the memory) and speed up attribute reads.  They are
+# spelled out rather than requested with ``dataclass(slots=True)``, which
+# needs Python 3.10+, so contexts behave the same on every supported
+# version.  A slotted field cannot carry a ``field(repr=False)`` default, so
+# the agent reference is left out of ``repr()`` by ``_context_repr`` instead.
+
+
+def _context_repr(self: Any) -> str:
+    """Return the dataclass-style ``repr()`` of a context, without its agent."""
+    shown = ", ".join(f"{f.name}={getattr(self, f.name)!r}" for f in fields(self) if f.name != "_agent")
+    return f"{type(self).__name__}({shown})"
+
+
+@dataclass(repr=False)
 class ResultContext:
     """
     Context passed to handlers registered for result events.
@@ -27,6 +44,19 @@ class ResultContext:
                 context.approve()
     """
 
+    __slots__ = (
+        "_agent",
+        "event_type",
+        "execution_uid",
+        "project_uid",
+        "result_data",
+        "result_metadata",
+        "result_uid",
+        "task_name",
+        "task_type",
+        "task_uid",
+    )
+
     execution_uid: str
     event_type: str
     task_uid: str
@@ -38,7 +68,9 @@ class ResultContext:
     project_uid: str | None
 
     # Internal reference — not part of the public API.
-    _agent: TaskAgent = field(repr=False)
+    _agent: _ActionSubmitter
+
+    __repr__ = _context_repr
 
     def approve(self, reason: str = "") -> None:
         """Approve this result and advance it through the workflow."""
@@ -65,7 +97,7 @@ class ResultContext:
         self._agent._submit_action(self.execution_uid, "skip", "")
 
 
-@dataclass
+@dataclass(repr=False)
 class TaskContext:
     """
     Context passed to handlers registered for task events.
@@ -80,6 +112,17 @@ class TaskContext:
             context.approve()
     """
 
+    __slots__ = (
+        "_agent",
+        "event_type",
+        "execution_uid",
+        "project_uid",
+        "task_name",
+        "task_status",
+        "task_type",
+        "task_uid",
+    )
+
     execution_uid: str
     event_type: str
     task_uid: str
@@ -89,7 +132,9 @@ class TaskContext:
     project_uid: str | None
 
     # Internal reference — not part of the public API.
-    _agent: TaskAgent = field(repr=False)
+    _agent: _ActionSubmitter
+
+    __repr__ = _context_repr
 
     def approve(self, reason: str = "") -> None:
         """Approve this task execution."""
@@ -116,7 +161,7 @@ class TaskContext:
         self._agent._submit_action(self.execution_uid, "skip", "")
 
 
-@dataclass
+@dataclass(repr=False)
 class EventContext:
     """
     Context passed to handlers for dataset and export events.
@@ -133,6 +178,8 @@ class EventContext:
             context.skip()
     """
 
+    __slots__ = ("_agent", "event_type", "execution_uid", "payload", "project_uid", "resource_type", "resource_uid")
+
     execution_uid: str
     event_type: str
     resource_uid: str | None
@@ -141,7 +188,9 @@ class EventContext:
     payload: dict[str, Any]
 
     # Internal reference — not part of the public API.
-    _agent: TaskAgent = field(repr=False)
+    _agent: _ActionSubmitter
+
+    __repr__ = _context_repr
 
     def approve(self, reason: str = "") -> None:
         """Approve this event execution."""
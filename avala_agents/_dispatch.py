@@ -0,0 +1,122 @@
+"""Context builders, one per event type.
+
+Builder lookup and context construction run once per dispatched
+execution.  They live in their own fully-annotated module so it can be
+compiled with mypyc (see ``pyproject.toml``); the pure-Python module is
+used otherwise.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from avala_agents._context import EventContext, ResultContext, TaskContext
+from avala_agents._types import _CATEGORY_BY_PREFIX, AGENT_EVENTS
+
+if TYPE_CHECKING:
+    from avala_agents._base import _BaseAgent
+
+logger = logging.getLogger(__name__)
+
+_HandlerContext = Union[ResultContext, TaskContext, EventContext]
+# ``execution_uid`` comes unvalidated from the server; it is ``Any`` so the
+# mypyc build (see ``pyproject.toml``) passes any value through, like the
+# pure-Python build, instead of raising ``TypeError``.
+_ContextBuilder = Callable[[Any, str, dict[str, Any], "_BaseAgent"], _HandlerContext]
+
+
+# The hot-path builders below pass fields positionally, in declaration
+# order: keyword arguments make dataclass construction ~40% slower.
+
+
+def _build_result_context(
+    execution_uid: Any, event_type: str, payload: dict[str, Any], agent: _BaseAgent
+) -> ResultContext:
+    get = payload.get
+    return ResultContext(
+        execution_uid,
+        event_type,
+        get("task_uid", ""),
+        get("result_uid", ""),
+        get("result_data", []),
+        get("result_metadata", {}),
+        get("task_name"),
+        get("task_type"),
+        get("project_uid"),
+        agent,
+    )
+
+
+def _build_task_context(execution_uid: Any, event_type: str, payload: dict[str, Any], agent: _BaseAgent) -> TaskContext:
+    get = payload.get
+    return TaskContext(
+        execution_uid,
+        event_type,
+        get("task_uid", ""),
+        get("task_name"),
+        get("task_type"),
+        get("task_status"),
+        get("project_uid"),
+        agent,
+    )
+
+
+def _make_resource_builder(resource_type: str) -> _ContextBuilder:
+    """Return an EventContext builder for one resource type (``dataset``, ``export``)."""
+
+    def build(execution_uid: Any, event_type: str, payload: dict[str, Any], agent: _BaseAgent) -> EventContext:
+        get = payload.get
+        return EventContext(
+            execution_uid,
+            event_type,
+            get("dataset_uid") or get("export_uid"),
+            resource_type,
+            get("project_uid"),
+            payload,
+            agent,
+        )
+
+    return build
+
+
+def _build_fallback_context(
+    execution_uid: Any, event_type: str, payload: dict[str, Any], agent: _BaseAgent
+) -> EventContext:
+    """Generic EventContext for event types this SDK does not know yet."""
+    logger.warning(
+        "Unrecognised event type '%s' — using generic EventContext. "
+        "Consider upgrading avala-agents to handle this event natively.",
+        event_type,
+    )
+    return EventContext(
+        execution_uid=execution_uid,
+        event_type=event_type,
+        resource_uid=None,
+        resource_type=None,
+        project_uid=payload.get("project_uid"),
+        payload=payload,
+        _agent=agent,
+    )
+
+
+def _builder_for(event_type: str) -> _ContextBuilder:
+    """Pick the context builder for *event_type* from its prefix."""
+    prefix = event_type.partition(".")[0]
+    category = _CATEGORY_BY_PREFIX[prefix]
+    if category == "result":
+        return _build_result_context
+    if category == "task":
+        return _build_task_context
+    return _make_resource_builder(prefix)
+
+
+# Event type -> context builder.  Classification happens once here, so
+# dispatch is a single dict lookup.
+_BUILDERS: dict[str, _ContextBuilder] = {event_type: _builder_for(event_type) for event_type in AGENT_EVENTS}
+
+
+def build_context(execution_uid: Any, event_type: str, payload: dict[str, Any], agent: _BaseAgent) -> _HandlerContext:
+    """Build the context for an execution, falling back to a generic one."""
+    builder = _BUILDERS.get(event_type, _build_fallback_context)
+    return builder(execution_uid, event_type, payload, agent)
@@ -0,0 +1,89 @@
+"""JSON encoding for request and response bodies.
+
+Uses :mod:`orjson` when it is installed (``pip install avala-agents[speedups]``)
+and the standard library otherwise.  Both variants encode to compact
+UTF-8 bytes and decode from bytes, so callers never handle ``str``.
+
+:class:`ExecutionParser` parses an executions response incrementally with
+:mod:`ijson` (also part of ``speedups``); :data:`STREAMING_AVAILABLE` is
+``False`` when ijson is missing, and callers then parse the whole body.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - exercised when ijson is absent
+    ijson = None
+
+STREAMING_AVAILABLE = ijson is not None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    import json
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize *obj* to compact JSON bytes."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(data: bytes) -> Any:
+        """Deserialize JSON *data*."""
+        return json.loads(data)
+
+else:
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize *obj* to compact JSON bytes."""
+        return orjson.dumps(obj)
+
+    def loads(data: bytes) -> Any:
+        """Deserialize JSON *data*."""
+        return orjson.loads(data)
+
+
+class ExecutionParser:
+    """Push parser for an executions response body.
+
+    Accepts either a bare JSON list or a paginated object with a
+    ``results`` list.  Each :meth:`feed` returns the executions completed
+    by that chunk, so the caller can start on them before the rest of the
+    body arrives.  Requires :data:`STREAMING_AVAILABLE`.
+
+    Raises:
+        ValueError: From :meth:`feed` or :meth:`close` if the body is not
+            valid JSON.
+    """
+
+    def __init__(self) -> None:
+        self._items: list[Any] = ijson.sendable_list()
+        self._coro: Any = None
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Parse *chunk* and return the executions it completed."""
+        if self._coro is None:
+            start = chunk.lstrip()[:1]
+            if not start:
+                return []
+            prefix = "item" if start == b"[" else "results.item"
+            # use_float keeps numbers as float instead of Decimal, like json.loads.
+            self._coro = ijson.items_coro(self._items, prefix, use_float=True)
+        try:
+            self._coro.send(chunk)
+        except ijson.JSONError as exc:
+            raise ValueError(f"Invalid executions response: {exc}") from exc
+        items = list(self._items)
+        del self._items[:]
+        return items
+
+    def close(self) -> list[Any]:
+        """Finish parsing and return any executions still buffered."""
+        if self._coro is None:
+            return []
+        try:
+            self._coro.close()
+        except ijson.JSONError as exc:
+            raise ValueError(f"Invalid executions response: {exc}") from exc
+        return list(self._items)
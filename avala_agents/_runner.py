@@ -2,15 +2,68 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
-import time
-from typing import TYPE_CHECKING
+import random
+import threading
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any
+
+from avala_agents._base import _MAX_KEEPALIVE_CONNECTIONS
 
 if TYPE_CHECKING:
     from avala_agents._agent import TaskAgent
+    from avala_agents._async_agent import AsyncTaskAgent
+    from avala_agents._base import _BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# Growth of the wait after each consecutive empty or failed poll, up to
+# ``max_poll_interval``.
+_BACKOFF_FACTOR = 1.5
+
+
+def _prefetch(fetch: Callable[[], list[dict[str, Any]]]) -> Future[list[dict[str, Any]]]:
+    """Run *fetch* in a daemon thread and return a future for its result.
+
+    A daemon thread does not keep the interpreter alive at exit, so a poll
+    still in flight (up to 30 seconds when long-polling) is abandoned
+    instead of waited for.
+    """
+    future: Future[list[dict[str, Any]]] = Future()
+
+    def worker() -> None:
+        try:
+            future.set_result(fetch())
+        except BaseException as exc:  # noqa: BLE001 - re-raised by future.result()
+            future.set_exception(exc)
+
+    threading.Thread(target=worker, name="avala-agents-prefetch", daemon=True).start()
+    return future
+
+
+def _idle_delay(agent: _BaseAgent, poll_interval: float) -> float:
+    """Return how long to wait before polling again after an empty poll.
+
+    A failed fetch backs off for ``poll_interval`` plus up to 50% jitter,
+    so agents that lose the server together do not reconnect in
+    lockstep.  A long-poll fetch already waited server-side, so the next
+    poll starts at once; otherwise the runner waits ``poll_interval``.
+    """
+    if agent._fetch_failed:
+        return poll_interval + random.uniform(0, 0.5 * poll_interval)
+    if agent._long_poll:
+        return 0.0
+    return poll_interval
+
+
+async def _aiter(executions: list[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    """Yield *executions* from an async iterator."""
+    for execution in executions:
+        yield execution
+
 
 class PollingRunner:
     """
@@ -20,12 +73,17 @@ class PollingRunner:
     Args:
         agent: The :class:`TaskAgent` that owns this runner.
         poll_interval: Seconds to wait between polls when no work is found.
+        max_poll_interval: Upper bound the wait grows to over consecutive
+            empty polls.  Defaults to ``poll_interval`` (no growth).
     """
 
-    def __init__(self, agent: TaskAgent, poll_interval: float = 5.0) -> None:
+    def __init__(self, agent: TaskAgent, poll_interval: float = 5.0, max_poll_interval: float | None = None) -> None:
         self._agent = agent
         self._poll_interval = poll_interval
+        self._max_poll_interval = max(poll_interval, max_poll_interval or 0.0)
         self._running = False
+        # Set by stop() so an idle wait ends at once instead of running out.
+        self._stop_event = threading.Event()
 
     # ------------------------------------------------------------------
     # Public interface
@@ -37,19 +95,40 @@ class PollingRunner:
         This method blocks indefinitely.  Interrupt it with a
         :exc:`KeyboardInterrupt` (Ctrl-C) or call :meth:`stop` from a
         separate thread.
+
+        While one batch is dispatched, the next is fetched in a
+        background thread, so a busy agent's cycle time is the longer of
+        the fetch and the dispatch rather than their sum.  Executions
+        already fetched when :meth:`stop` is called are still processed;
+        on :exc:`KeyboardInterrupt` a prefetched batch is dropped and
+        its executions stay unresolved until the server-side timeout.
+
+        Each consecutive empty poll waits 1.5x longer than the last, up to
+        ``max_poll_interval``; the wait resets once work arrives.
         """
         self._running = True
+        self._stop_event.clear()
+        interval = self._poll_interval
         logger.info(
             "Agent '%s' started polling (interval=%.1fs).",
             self._agent.name,
             self._poll_interval,
         )
         try:
-            while self._running:
-                processed = self.run_once()
-                if processed == 0:
-                    # Nothing to do — wait before the next poll.
-                    time.sleep(self._poll_interval)
+            executions = self._agent._fetch_pending_executions()
+            while executions or self._running:
+                if executions:
+                    interval = self._poll_interval
+                    prefetch = _prefetch(self._agent._fetch_pending_executions) if self._running else None
+                    self._process_batch(executions)
+                    executions = prefetch.result() if prefetch is not None else []
+                    continue
+                delay = _idle_delay(self._agent, interval)
+                if delay:
+                    self._stop_event.wait(delay)
+                    interval = min(interval * _BACKOFF_FACTOR, self._max_poll_interval)
+                if self._running:
+                    executions = self._agent._fetch_pending_executions()
         except KeyboardInterrupt:
             logger.info("Agent '%s' interrupted — shutting down.", self._agent.name)
         finally:
@@ -58,36 +137,211 @@ class PollingRunner:
     def run_once(self) -> int:
         """Execute a single poll iteration.
 
-        Fetches pending executions and dispatches each one to the
-        appropriate handler.
+        Fetches pending executions, dispatches each one to the
+        appropriate handler as soon as it has been parsed, then submits
+        the resulting actions in a single bulk request.
+
+        Returns:
+            The number of executions that were processed.
+        """
+        return self._process_batch(self._agent._iter_pending_executions())
+
+    def _process_batch(self, executions: Iterable[dict[str, Any]]) -> int:
+        """Dispatch *executions* and flush their actions in one request.
+
+        Returns:
+            The number of executions that were processed.
+        """
+        self._agent._begin_batch()
+        try:
+            return sum(1 for execution in executions if self._safe_dispatch(execution))
+        finally:
+            # Actions taken by the handlers go out in one bulk request.
+            self._agent._flush_batch()
+
+    def _safe_dispatch(self, execution: dict[str, Any]) -> bool:
+        """Dispatch one execution, isolating handler errors.
+
+        Returns:
+            ``True`` if the execution was dispatched successfully.
+        """
+        try:
+            self._agent._dispatch(execution)
+            return True
+        except Exception:
+            execution_uid = execution.get("uid", "")
+            logger.exception(
+                "Unhandled error while processing execution '%s'.",
+                execution_uid,
+            )
+            # Submit a skip action so the execution does not stay
+            # stuck in RUNNING until the server-side timeout fires.
+            try:
+                self._agent._submit_action(execution_uid, "skip", "handler raised an unhandled exception")
+            except Exception:
+                logger.warning(
+                    "Failed to submit skip action for execution '%s'.",
+                    execution_uid,
+                    exc_info=True,
+                )
+            return False
+
+    def stop(self) -> None:
+        """Signal the polling loop to stop after the current iteration.
+
+        An idle wait between polls is interrupted immediately.
+        """
+        self._running = False
+        self._stop_event.set()
+
+
+class AsyncPollingRunner:
+    """
+    Asyncio counterpart of :class:`PollingRunner` used by
+    :class:`AsyncTaskAgent`.
+
+    The executions returned by a poll are dispatched concurrently, at
+    most ``max_concurrency`` at a time.
+
+    Args:
+        agent: The :class:`AsyncTaskAgent` that owns this runner.
+        poll_interval: Seconds to wait between polls when no work is found.
+        max_poll_interval: Upper bound the wait grows to over consecutive
+            empty polls.  Defaults to ``poll_interval`` (no growth).
+        max_concurrency: Maximum number of executions dispatched at once.
+    """
+
+    def __init__(
+        self,
+        agent: AsyncTaskAgent,
+        poll_interval: float = 5.0,
+        max_poll_interval: float | None = None,
+        max_concurrency: int = _MAX_KEEPALIVE_CONNECTIONS,
+    ) -> None:
+        self._agent = agent
+        self._poll_interval = poll_interval
+        self._max_poll_interval = max(poll_interval, max_poll_interval or 0.0)
+        self._max_concurrency = max_concurrency
+        self._running = False
+        # Created in run(): before Python 3.10 an asyncio.Event binds to
+        # the loop current at construction.
+        self._stop_event: asyncio.Event | None = None
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    async def run(self) -> None:
+        """Run the polling loop until :meth:`stop` is called or the task
+        is cancelled.
+
+        The next batch is fetched in a background task while the current
+        one is dispatched, and the idle wait backs off as in
+        :meth:`PollingRunner.run`.
+        """
+        self._running = True
+        stop_event = self._stop_event = asyncio.Event()
+        interval = self._poll_interval
+        logger.info(
+            "Agent '%s' started polling (interval=%.1fs).",
+            self._agent.name,
+            self._poll_interval,
+        )
+        prefetch: asyncio.Future[list[dict[str, Any]]] | None = None
+        try:
+            executions = await self._agent._fetch_pending_executions()
+            while executions or self._running:
+                if executions:
+                    interval = self._poll_interval
+                    if self._running:
+                        prefetch = asyncio.ensure_future(self._agent._fetch_pending_executions())
+                    await self._process_batch(_aiter(executions))
+                    executions = await prefetch if prefetch is not None else []
+                    prefetch = None
+                    continue
+                delay = _idle_delay(self._agent, interval)
+                if delay:
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(stop_event.wait(), delay)
+                    interval = min(interval * _BACKOFF_FACTOR, self._max_poll_interval)
+                if self._running:
+                    executions = await self._agent._fetch_pending_executions()
+        finally:
+            self._running = False
+            if prefetch is not None:
+                prefetch.cancel()
+
+    async def run_once(self) -> int:
+        """Execute a single poll iteration.
+
+        Fetches pending executions and dispatches them concurrently,
+        starting each one as soon as it has been parsed, then submits the
+        resulting actions in a single bulk request.
+
+        Returns:
+            The number of executions that were processed.
+        """
+        return await self._process_batch(self._agent._iter_pending_executions())
+
+    async def _process_batch(self, executions: AsyncIterable[dict[str, Any]]) -> int:
+        """Dispatch *executions* concurrently and flush their actions in
+        one request.
 
         Returns:
             The number of executions that were processed.
         """
-        executions = self._agent._fetch_pending_executions()
-        count = 0
-        for execution in executions:
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        tasks: list[asyncio.Task[bool]] = []
+        self._agent._begin_batch()
+        try:
             try:
-                self._agent._dispatch(execution)
-                count += 1
+                async for execution in executions:
+                    tasks.append(asyncio.ensure_future(self._process(execution, semaphore)))
+            except Exception:
+                # The page broke off mid-stream (e.g. a truncated body):
+                # let the executions already started finish so their
+                # actions are flushed, then report the error.
+                await asyncio.gather(*tasks)
+                raise
+            results = await asyncio.gather(*tasks)
+        finally:
+            # No-op unless the poll was cancelled before every task finished.
+            for task in tasks:
+                task.cancel()
+            await self._agent._flush_batch()
+        return sum(results)
+
+    async def _process(self, execution: dict[str, Any], semaphore: asyncio.Semaphore) -> bool:
+        """Dispatch one execution, isolating handler errors.
+
+        Returns:
+            ``True`` if the execution was dispatched successfully.
+        """
+        async with semaphore:
+            try:
+                await self._agent._dispatch(execution)
+                return True
             except Exception:
                 execution_uid = execution.get("uid", "")
                 logger.exception(
                     "Unhandled error while processing execution '%s'.",
                     execution_uid,
                 )
-                # Submit a skip action so the execution does not stay
-                # stuck in RUNNING until the server-side timeout fires.
                 try:
-                    self._agent._submit_action(execution_uid, "skip", "handler raised an unhandled exception")
+                    await self._agent._queue_action(execution_uid, "skip", "handler raised an unhandled exception")
                 except Exception:
                     logger.warning(
                         "Failed to submit skip action for execution '%s'.",
                         execution_uid,
                         exc_info=True,
                     )
-        return count
+                return False
 
     def stop(self) -> None:
-        """Signal the polling loop to stop after the current iteration."""
+        """Signal the polling loop to stop after the current iteration.
+
+        An idle wait between polls is interrupted immediately.
+        """
         self._running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from typing import Any, NamedTuple
 
 # All event identifiers the agent framework can handle.
 # Must stay in sync with server/apps/agent/constants.py ALL_AGENT_EVENTS.
@@ -19,6 +18,10 @@ AGENT_EVENTS = [
     "result.rejected",
 ]
 
+# O(1) membership for validating @agent.on; AGENT_EVENTS stays an ordered
+# list for display.
+_AGENT_EVENT_SET = frozenset(AGENT_EVENTS)
+
 # Events whose execution payload contains result-level data.
 RESULT_EVENTS = {
     "result.submitted",
@@ -44,13 +47,26 @@ EXPORT_EVENTS = {
     "export.failed",
 }
 
+# Context category by event prefix (the part before the dot).  Every
+# event in AGENT_EVENTS must have an entry; dataset and export events both
+# carry resource-level data.
+_CATEGORY_BY_PREFIX = {
+    "result": "result",
+    "task": "task",
+    "dataset": "resource",
+    "export": "resource",
+}
+
 # Valid action values accepted by POST /api/v1/agent-actions/.
 VALID_ACTIONS = {"approve", "reject", "flag", "skip"}
 
 
-@dataclass
-class AgentEvent:
-    """Raw event received from the agent executions API."""
+class AgentEvent(NamedTuple):
+    """Raw event received from the agent executions API.
+
+    A named tuple: no per-instance ``__dict__``, and cheaper to build
+    than a dataclass.
+    """
 
     execution_uid: str
     event_type: str
@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
+import pytest
+
 BASE_URL = "https://api.avala.ai/api/v1"
 
 REGISTER_RESPONSE = {"uid": "00000000-0000-4000-8000-000000000001", "name": "test-agent"}
 
+# Endpoint URLs, built once rather than repeated at every mock.
+AGENTS_URL = f"{BASE_URL}/agents/"
+EXECUTIONS_URL = f"{BASE_URL}/agents/{REGISTER_RESPONSE['uid']}/executions/"
+ACTIONS_URL = f"{BASE_URL}/agent-actions/"
+BULK_ACTIONS_URL = f"{BASE_URL}/agent-actions/bulk/"
+
 PENDING_EXECUTION_RESULT = {
     "uid": "00000000-0000-4000-8000-000000000010",
     "event_type": "result.submitted",
@@ -31,3 +41,9 @@ PENDING_EXECUTION_TASK = {
         "project_uid": "00000000-0000-4000-8000-000000000040",
     },
 }
+
+
+@pytest.fixture(autouse=True)
+def _isolate_registration_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep registration cache files out of the real user cache directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
@@ -2,14 +2,26 @@
 
 from __future__ import annotations
 
+import dataclasses
+import json
+import logging
+from pathlib import Path
+
 import httpx
 import pytest
 import respx
 
-from avala_agents import TaskAgent
+from avala_agents import TaskAgent, _base
+from avala_agents._context import EventContext, ResultContext, TaskContext
+from avala_agents._dispatch import _BUILDERS
 from avala_agents._exceptions import AgentActionError, AgentRegistrationError
+from avala_agents._json import STREAMING_AVAILABLE
+from avala_agents._types import AGENT_EVENTS
 from tests.conftest import (
-    BASE_URL,
+    ACTIONS_URL,
+    AGENTS_URL,
+    BULK_ACTIONS_URL,
+    EXECUTIONS_URL,
     PENDING_EXECUTION_RESULT,
     PENDING_EXECUTION_TASK,
     REGISTER_RESPONSE,
@@ -30,6 +42,16 @@ def test_agent_requires_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
         TaskAgent()
 
 
+def test_base_agent_subclass_must_implement_submit_action() -> None:
+    """A subclass missing _submit_action fails at construction, not mid-dispatch."""
+
+    class IncompleteAgent(_base._BaseAgent):
+        pass
+
+    with pytest.raises(TypeError, match="_submit_action"):
+        IncompleteAgent(api_key="avk_test")  # type: ignore[abstract]
+
+
 def test_agent_accepts_explicit_api_key() -> None:
     """TaskAgent can be created with an explicit API key."""
     agent = TaskAgent(api_key="avk_test")
@@ -76,6 +98,18 @@ def test_on_decorator_registers_handler() -> None:
     agent.close()
 
 
+def test_on_decorator_resolves_context_builder() -> None:
+    """@agent.on pairs the handler with its context builder up front."""
+    agent = TaskAgent(api_key="avk_test")
+
+    @agent.on("dataset.created")
+    def handler(ctx):  # type: ignore[no-untyped-def]
+        pass
+
+    assert agent._routes["dataset.created"] == (handler, _BUILDERS["dataset.created"], False)
+    agent.close()
+
+
 def test_on_decorator_returns_original_function() -> None:
     """@agent.on returns the unmodified handler function."""
     agent = TaskAgent(api_key="avk_test")
@@ -120,7 +154,7 @@ def test_multiple_handlers_can_be_registered() -> None:
 @respx.mock
 def test_register_posts_to_agents_endpoint() -> None:
     """_register() POSTs to /agents/ and stores the returned uid."""
-    route = respx.post(f"{BASE_URL}/agents/").mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
     agent = TaskAgent(api_key="avk_test", name="test-agent")
     agent._register()
 
@@ -132,7 +166,7 @@ def test_register_posts_to_agents_endpoint() -> None:
 @respx.mock
 def test_register_is_idempotent() -> None:
     """_register() does not POST again if already registered."""
-    route = respx.post(f"{BASE_URL}/agents/").mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
     agent = TaskAgent(api_key="avk_test", name="test-agent")
     agent._register()
     agent._register()
@@ -144,7 +178,7 @@ def test_register_is_idempotent() -> None:
 @respx.mock
 def test_register_raises_on_server_error() -> None:
     """_register() raises AgentRegistrationError on non-2xx response."""
-    respx.post(f"{BASE_URL}/agents/").mock(return_value=httpx.Response(500, json={"detail": "Internal Server Error"}))
+    respx.post(AGENTS_URL).mock(return_value=httpx.Response(500, json={"detail": "Internal Server Error"}))
     agent = TaskAgent(api_key="avk_test")
     with pytest.raises(AgentRegistrationError, match="HTTP 500"):
         agent._register()
@@ -154,13 +188,11 @@ def test_register_raises_on_server_error() -> None:
 @respx.mock
 def test_register_includes_project_when_set() -> None:
     """_register() includes project in the POST body when configured."""
-    route = respx.post(f"{BASE_URL}/agents/").mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
     agent = TaskAgent(api_key="avk_test", project="proj-001")
     agent._register()
 
     sent = route.calls.last.request
-    import json
-
     body = json.loads(sent.content)
     assert body["project"] == "proj-001"
     agent.close()
@@ -169,7 +201,7 @@ def test_register_includes_project_when_set() -> None:
 @respx.mock
 def test_register_includes_subscribed_events() -> None:
     """_register() includes the registered event names in the payload."""
-    route = respx.post(f"{BASE_URL}/agents/").mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
     agent = TaskAgent(api_key="avk_test")
 
     @agent.on("result.submitted")
@@ -178,13 +210,139 @@ def test_register_includes_subscribed_events() -> None:
 
     agent._register()
 
-    import json
-
     body = json.loads(route.calls.last.request.content)
     assert "result.submitted" in body["events"]
     agent.close()
 
 
+@respx.mock
+def test_register_again_after_handler_added() -> None:
+    """_register() re-registers, with the new event, when a handler was added since."""
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    agent = TaskAgent(api_key="avk_test", name="test-agent")
+    agent.on("task.completed")(lambda ctx: None)
+    agent._register()
+
+    @agent.on("result.submitted")
+    def h(ctx):  # type: ignore[no-untyped-def]
+        pass
+
+    agent._register()
+
+    assert route.call_count == 2
+    assert json.loads(route.calls.last.request.content)["events"] == ["result.submitted", "task.completed"]
+    agent.close()
+
+
+@respx.mock
+def test_register_skips_when_handler_replaced_for_same_event() -> None:
+    """Re-registering a handler for an already subscribed event keeps the registration."""
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    agent = TaskAgent(api_key="avk_test", name="test-agent")
+    agent.on("task.completed")(lambda ctx: None)
+    agent._register()
+    agent.on("task.completed")(lambda ctx: None)
+    agent._register()
+
+    assert route.call_count == 1
+    agent.close()
+
+
+@respx.mock
+def test_register_retry_reuses_serialized_body(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A retry after a failed registration does not re-serialize the body."""
+    serialized: list[object] = []
+    real_dumps = _base.dumps
+
+    def counting_dumps(obj: object) -> bytes:
+        serialized.append(obj)
+        return real_dumps(obj)
+
+    monkeypatch.setattr(_base, "dumps", counting_dumps)
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(503, json={}))
+    agent = TaskAgent(api_key="avk_test", name="test-agent")
+
+    for _ in range(2):
+        with pytest.raises(AgentRegistrationError):
+            agent._register()
+
+    assert route.call_count == 2
+    assert route.calls[0].request.content == route.calls[1].request.content
+    assert len(serialized) == 1
+    agent.close()
+
+
+@respx.mock
+def test_register_reuses_cached_uid_on_not_modified() -> None:
+    """A restarted agent sends If-None-Match and reuses the cached uid on 304."""
+    route = respx.post(AGENTS_URL)
+    route.mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE, headers={"X-Avala-Long-Poll": "true"}))
+    first = TaskAgent(api_key="avk_test", name="test-agent")
+    first._register()
+    first.close()
+    assert "If-None-Match" not in route.calls.last.request.headers
+
+    route.mock(return_value=httpx.Response(304))
+    second = TaskAgent(api_key="avk_test", name="test-agent")
+    second._register()
+
+    assert route.calls.last.request.headers["If-None-Match"]
+    assert second._agent_uid == AGENT_UID
+    assert second._long_poll is True
+    second.close()
+
+
+@respx.mock
+def test_register_sends_unconditional_request_when_config_changed() -> None:
+    """A cached registration is not offered once the handlers differ."""
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    first = TaskAgent(api_key="avk_test", name="test-agent")
+    first._register()
+    first.close()
+
+    second = TaskAgent(api_key="avk_test", name="test-agent")
+
+    @second.on("result.submitted")
+    def h(ctx):  # type: ignore[no-untyped-def]
+        pass
+
+    second._register()
+
+    assert "If-None-Match" not in route.calls.last.request.headers
+    second.close()
+
+
+@respx.mock
+def test_register_sends_unconditional_request_when_api_key_changed() -> None:
+    """A UID cached under one API key is not offered under another."""
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    first = TaskAgent(api_key="avk_account_a", name="test-agent")
+    first._register()
+    first.close()
+
+    second = TaskAgent(api_key="avk_account_b", name="test-agent")
+    second._register()
+
+    assert "If-None-Match" not in route.calls.last.request.headers
+    second.close()
+
+
+@respx.mock
+def test_register_ignores_corrupt_cache(tmp_path: Path) -> None:
+    """An unreadable cache file falls back to a normal registration."""
+    cache_file = tmp_path / "cache" / "avala-agents" / "test-agent.json"
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_text("{not json")
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    agent = TaskAgent(api_key="avk_test", name="test-agent")
+    agent._register()
+
+    assert "If-None-Match" not in route.calls.last.request.headers
+    assert agent._agent_uid == AGENT_UID
+    assert AGENT_UID in cache_file.read_text()
+    agent.close()
+
+
 # ---------------------------------------------------------------------------
 # Fetching executions
 # ---------------------------------------------------------------------------
@@ -196,7 +354,7 @@ def test_fetch_pending_executions_returns_list() -> None:
     agent = TaskAgent(api_key="avk_test")
     agent._agent_uid = AGENT_UID
 
-    respx.get(f"{BASE_URL}/agents/{AGENT_UID}/executions/").mock(
+    respx.get(EXECUTIONS_URL).mock(
         return_value=httpx.Response(
             200,
             json={"results": [PENDING_EXECUTION_RESULT], "next": None},
@@ -209,13 +367,62 @@ def test_fetch_pending_executions_returns_list() -> None:
     agent.close()
 
 
+@respx.mock
+def test_iter_pending_executions_parses_chunked_body() -> None:
+    """Executions split across response chunks are parsed intact."""
+    agent = TaskAgent(api_key="avk_test")
+    agent._agent_uid = AGENT_UID
+    body = json.dumps([PENDING_EXECUTION_RESULT, PENDING_EXECUTION_TASK]).encode()
+    chunks = [body[i : i + 16] for i in range(0, len(body), 16)]
+
+    respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, content=iter(chunks)))
+
+    executions = list(agent._iter_pending_executions())
+    assert executions == [PENDING_EXECUTION_RESULT, PENDING_EXECUTION_TASK]
+    assert agent._fetch_failed is False
+    agent.close()
+
+
+@pytest.mark.skipif(not STREAMING_AVAILABLE, reason="requires ijson")
+@respx.mock
+def test_iter_pending_executions_marks_fetch_failed_on_truncated_body() -> None:
+    """A body that stops mid-stream raises and counts as a failed fetch."""
+    agent = TaskAgent(api_key="avk_test")
+    agent._agent_uid = AGENT_UID
+    body = json.dumps([PENDING_EXECUTION_RESULT, PENDING_EXECUTION_TASK]).encode()
+    respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, content=body[:-20]))
+
+    executions = agent._iter_pending_executions()
+    assert next(executions) == PENDING_EXECUTION_RESULT
+    with pytest.raises(ValueError):
+        next(executions)
+    assert agent._fetch_failed is True
+    agent.close()
+
+
+@respx.mock
+def test_fetch_pending_executions_decodes_whole_page(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The prefetch path decodes the page in one go, never through ijson."""
+
+    def no_streaming() -> None:
+        raise AssertionError("_fetch_pending_executions must not stream-parse")
+
+    monkeypatch.setattr("avala_agents._agent.ExecutionParser", no_streaming)
+    agent = TaskAgent(api_key="avk_test")
+    agent._agent_uid = AGENT_UID
+    respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, json=[PENDING_EXECUTION_RESULT]))
+
+    assert agent._fetch_pending_executions() == [PENDING_EXECUTION_RESULT]
+    agent.close()
+
+
 @respx.mock
 def test_fetch_pending_executions_returns_empty_on_error() -> None:
     """_fetch_pending_executions() returns [] on a server error (no exception)."""
     agent = TaskAgent(api_key="avk_test")
     agent._agent_uid = AGENT_UID
 
-    respx.get(f"{BASE_URL}/agents/{AGENT_UID}/executions/").mock(return_value=httpx.Response(503, json={}))
+    respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(503, json={}))
 
     executions = agent._fetch_pending_executions()
     assert executions == []
@@ -230,6 +437,92 @@ def test_fetch_pending_executions_returns_empty_when_not_registered() -> None:
     agent.close()
 
 
+@respx.mock
+def test_fetch_uses_long_poll_when_server_supports_it() -> None:
+    """A long-poll capability header at registration adds ?wait= to polls."""
+    respx.post(AGENTS_URL).mock(
+        return_value=httpx.Response(201, json=REGISTER_RESPONSE, headers={"X-Avala-Long-Poll": "true"})
+    )
+    route = respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, json={"results": []}))
+    agent = TaskAgent(api_key="avk_test")
+    agent._register()
+    agent._fetch_pending_executions()
+
+    request = route.calls.last.request
+    assert request.url.params["wait"] == "30"
+    assert request.extensions["timeout"]["read"] > 30
+    assert agent._long_poll is True
+    agent.close()
+
+
+@respx.mock
+def test_run_once_does_not_long_poll() -> None:
+    """run_once() takes a snapshot even when the server supports long polls."""
+    respx.post(AGENTS_URL).mock(
+        return_value=httpx.Response(201, json=REGISTER_RESPONSE, headers={"X-Avala-Long-Poll": "true"})
+    )
+    route = respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, json={"results": []}))
+    agent = TaskAgent(api_key="avk_test", project="proj-001")
+    agent.run_once()
+
+    request = route.calls.last.request
+    assert "wait" not in request.url.params
+    assert request.url.params["project"] == "proj-001"
+    assert request.extensions["timeout"]["read"] == 30.0
+    agent.close()
+
+
+@respx.mock
+def test_fetch_does_not_long_poll_without_capability_header() -> None:
+    """Without the capability header, polls are plain short requests."""
+    respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    route = respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, json={"results": []}))
+    agent = TaskAgent(api_key="avk_test")
+    agent._register()
+    agent._fetch_pending_executions()
+
+    assert "wait" not in route.calls.last.request.url.params
+    assert agent._long_poll is False
+    agent.close()
+
+
+@respx.mock
+def test_fetch_reuses_precomputed_poll_request() -> None:
+    """The poll URL and query are built once at registration, not per poll."""
+    respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    route = respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, json={"results": []}))
+    agent = TaskAgent(api_key="avk_test", project="proj-001", task_types=["bounding_box", "polygon"])
+    agent._register()
+    url = agent._executions_url
+    agent._fetch_pending_executions()
+    agent._fetch_pending_executions()
+
+    assert agent._executions_url is url
+    assert route.call_count == 2
+    query = route.calls.last.request.url.params
+    assert query["status"] == "pending"
+    assert query["project"] == "proj-001"
+    assert query["task_types"] == "bounding_box,polygon"
+    agent.close()
+
+
+@respx.mock
+def test_fetch_records_failure() -> None:
+    """_fetch_pending_executions() flags failed polls for the runner."""
+    agent = TaskAgent(api_key="avk_test")
+    agent._agent_uid = AGENT_UID
+    route = respx.get(EXECUTIONS_URL)
+
+    route.mock(return_value=httpx.Response(503, json={}))
+    agent._fetch_pending_executions()
+    assert agent._fetch_failed is True
+
+    route.mock(return_value=httpx.Response(200, json={"results": []}))
+    agent._fetch_pending_executions()
+    assert agent._fetch_failed is False
+    agent.close()
+
+
 # ---------------------------------------------------------------------------
 # Action submission
 # ---------------------------------------------------------------------------
@@ -238,13 +531,11 @@ def test_fetch_pending_executions_returns_empty_when_not_registered() -> None:
 @respx.mock
 def test_submit_action_posts_to_agent_actions() -> None:
     """_submit_action() POSTs to /agent-actions/ with correct body."""
-    route = respx.post(f"{BASE_URL}/agent-actions/").mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
     exec_uid = PENDING_EXECUTION_RESULT["uid"]
     agent = TaskAgent(api_key="avk_test")
     agent._submit_action(exec_uid, "approve", "Looks good")
 
-    import json
-
     body = json.loads(route.calls.last.request.content)
     assert body["execution"] == exec_uid
     assert body["action"] == "approve"
@@ -255,12 +546,10 @@ def test_submit_action_posts_to_agent_actions() -> None:
 @respx.mock
 def test_submit_action_omits_reason_when_empty() -> None:
     """_submit_action() omits 'reason' from the payload when empty."""
-    route = respx.post(f"{BASE_URL}/agent-actions/").mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
     agent = TaskAgent(api_key="avk_test")
     agent._submit_action(PENDING_EXECUTION_RESULT["uid"], "approve", "")
 
-    import json
-
     body = json.loads(route.calls.last.request.content)
     assert "reason" not in body
     agent.close()
@@ -269,7 +558,7 @@ def test_submit_action_omits_reason_when_empty() -> None:
 @respx.mock
 def test_submit_action_raises_on_server_error() -> None:
     """_submit_action() raises AgentActionError on non-2xx response."""
-    respx.post(f"{BASE_URL}/agent-actions/").mock(return_value=httpx.Response(400, json={"detail": "Bad request"}))
+    respx.post(ACTIONS_URL).mock(return_value=httpx.Response(400, json={"detail": "Bad request"}))
     agent = TaskAgent(api_key="avk_test")
     with pytest.raises(AgentActionError, match="HTTP 400"):
         agent._submit_action(PENDING_EXECUTION_RESULT["uid"], "approve", "")
@@ -283,17 +572,9 @@ def test_submit_action_raises_on_server_error() -> None:
 
 def test_build_context_result_event() -> None:
     """_build_context() returns a ResultContext for result events."""
-    from avala_agents._context import ResultContext
-    from avala_agents._types import AgentEvent
-
     agent = TaskAgent(api_key="avk_test")
     payload = PENDING_EXECUTION_RESULT["event_payload"]
-    event = AgentEvent(
-        execution_uid=PENDING_EXECUTION_RESULT["uid"],
-        event_type="result.submitted",
-        payload=payload,
-    )
-    ctx = agent._build_context(event)
+    ctx = agent._build_context(PENDING_EXECUTION_RESULT["uid"], "result.submitted", payload)
     assert isinstance(ctx, ResultContext)
     assert ctx.result_uid == payload["result_uid"]
     assert ctx.task_uid == payload["task_uid"]
@@ -305,17 +586,9 @@ def test_build_context_result_event() -> None:
 
 def test_build_context_task_event() -> None:
     """_build_context() returns a TaskContext for task events."""
-    from avala_agents._context import TaskContext
-    from avala_agents._types import AgentEvent
-
     agent = TaskAgent(api_key="avk_test")
     payload = PENDING_EXECUTION_TASK["event_payload"]
-    event = AgentEvent(
-        execution_uid=PENDING_EXECUTION_TASK["uid"],
-        event_type="task.completed",
-        payload=payload,
-    )
-    ctx = agent._build_context(event)
+    ctx = agent._build_context(PENDING_EXECUTION_TASK["uid"], "task.completed", payload)
     assert isinstance(ctx, TaskContext)
     assert ctx.task_uid == payload["task_uid"]
     assert ctx.task_status == "completed"
@@ -324,20 +597,12 @@ def test_build_context_task_event() -> None:
 
 def test_build_context_dataset_event() -> None:
     """_build_context() returns an EventContext for dataset events."""
-    from avala_agents._context import EventContext
-    from avala_agents._types import AgentEvent
-
     agent = TaskAgent(api_key="avk_test")
     payload = {
         "dataset_uid": "00000000-0000-4000-8000-000000000050",
         "project_uid": "00000000-0000-4000-8000-000000000040",
     }
-    event = AgentEvent(
-        execution_uid="00000000-0000-4000-8000-000000000099",
-        event_type="dataset.created",
-        payload=payload,
-    )
-    ctx = agent._build_context(event)
+    ctx = agent._build_context("00000000-0000-4000-8000-000000000099", "dataset.created", payload)
     assert isinstance(ctx, EventContext)
     assert ctx.resource_uid == payload["dataset_uid"]
     assert ctx.resource_type == "dataset"
@@ -348,20 +613,12 @@ def test_build_context_dataset_event() -> None:
 
 def test_build_context_export_event() -> None:
     """_build_context() returns an EventContext for export events."""
-    from avala_agents._context import EventContext
-    from avala_agents._types import AgentEvent
-
     agent = TaskAgent(api_key="avk_test")
     payload = {
         "export_uid": "00000000-0000-4000-8000-000000000060",
         "project_uid": "00000000-0000-4000-8000-000000000040",
     }
-    event = AgentEvent(
-        execution_uid="00000000-0000-4000-8000-000000000098",
-        event_type="export.completed",
-        payload=payload,
-    )
-    ctx = agent._build_context(event)
+    ctx = agent._build_context("00000000-0000-4000-8000-000000000098", "export.completed", payload)
     assert isinstance(ctx, EventContext)
     assert ctx.resource_uid == payload["export_uid"]
     assert ctx.resource_type == "export"
@@ -370,22 +627,65 @@ def test_build_context_export_event() -> None:
 
 def test_build_context_unknown_event_uses_fallback() -> None:
     """_build_context() returns EventContext with resource_type=None for unknown events."""
-    from avala_agents._context import EventContext
-    from avala_agents._types import AgentEvent
-
     agent = TaskAgent(api_key="avk_test")
-    event = AgentEvent(
-        execution_uid="00000000-0000-4000-8000-000000000097",
-        event_type="future.event",
-        payload={"some_key": "value"},
-    )
-    ctx = agent._build_context(event)
+    ctx = agent._build_context("00000000-0000-4000-8000-000000000097", "future.event", {"some_key": "value"})
     assert isinstance(ctx, EventContext)
     assert ctx.resource_uid is None
     assert ctx.resource_type is None
     agent.close()
 
 
+def test_every_agent_event_has_a_context_builder() -> None:
+    """Every supported event maps to a dedicated context builder."""
+    assert set(_BUILDERS) == set(AGENT_EVENTS)
+
+
+@pytest.mark.parametrize("event_type", ["result.submitted", "task.completed", "dataset.created"])
+def test_context_builders_fill_fields_from_matching_payload_keys(event_type: str) -> None:
+    """Each context field holds the payload value of the same name."""
+    agent = TaskAgent(api_key="avk_test")
+    keys = ("task_uid", "result_uid", "result_data", "result_metadata", "task_name", "task_type", "task_status")
+    payload = {key: f"<{key}>" for key in (*keys, "project_uid")}
+
+    ctx = agent._build_context("exec-001", event_type, payload)
+
+    assert (ctx.execution_uid, ctx.event_type, ctx.project_uid) == ("exec-001", event_type, "<project_uid>")
+    for f in dataclasses.fields(ctx):
+        if f.name in keys:
+            assert getattr(ctx, f.name) == payload[f.name]
+    agent.close()
+
+
+def test_result_context_keeps_payload_containers_as_sent() -> None:
+    """result_data/result_metadata default only when missing; null and empty values are kept."""
+    agent = TaskAgent(api_key="avk_test")
+    data: list[dict] = []
+    ctx = agent._build_context("exec-001", "result.submitted", {"result_data": data, "result_metadata": None})
+    assert ctx.result_data is data
+    assert ctx.result_metadata is None
+
+    ctx = agent._build_context("exec-001", "result.submitted", {})
+    assert (ctx.result_data, ctx.result_metadata) == ([], {})
+    agent.close()
+
+
+@pytest.mark.parametrize(
+    ("event_type", "key", "value"),
+    [
+        ("task.completed", "task_uid", None),
+        ("task.completed", "task_name", 123),
+        ("result.submitted", "result_data", {"label": "car"}),
+    ],
+)
+def test_context_builders_pass_unexpected_value_types_through(event_type: str, key: str, value: object) -> None:
+    """Payload values are not type-checked, in the pure-Python and mypyc builds alike."""
+    agent = TaskAgent(api_key="avk_test")
+    ctx = agent._build_context(None, event_type, {key: value})  # type: ignore[arg-type]
+    assert ctx.execution_uid is None
+    assert getattr(ctx, key) == value
+    agent.close()
+
+
 # ---------------------------------------------------------------------------
 # Dispatch
 # ---------------------------------------------------------------------------
@@ -394,9 +694,7 @@ def test_build_context_unknown_event_uses_fallback() -> None:
 @respx.mock
 def test_dispatch_calls_handler_and_does_not_auto_skip() -> None:
     """_dispatch() calls the registered handler; handler controls the action."""
-    action_route = respx.post(f"{BASE_URL}/agent-actions/").mock(
-        return_value=httpx.Response(200, json={"status": "ok"})
-    )
+    action_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
     agent = TaskAgent(api_key="avk_test")
 
     calls: list[object] = []
@@ -411,23 +709,37 @@ def test_dispatch_calls_handler_and_does_not_auto_skip() -> None:
     assert len(calls) == 1
     assert action_route.call_count == 1
 
-    import json
-
     body = json.loads(action_route.calls.last.request.content)
     assert body["action"] == "approve"
     agent.close()
 
 
+@respx.mock
+def test_dispatch_logs_at_debug_level(caplog: pytest.LogCaptureFixture) -> None:
+    """Dispatch and action submission are logged when DEBUG is enabled."""
+    respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    agent = TaskAgent(api_key="avk_test")
+
+    @agent.on("result.submitted")
+    def check_quality(ctx):  # type: ignore[no-untyped-def]
+        ctx.approve()
+
+    with caplog.at_level(logging.DEBUG, logger="avala_agents"):
+        agent._dispatch(PENDING_EXECUTION_RESULT)
+
+    assert "to handler 'check_quality'" in caplog.text
+    assert "Action 'approve' submitted" in caplog.text
+    agent.close()
+
+
 @respx.mock
 def test_dispatch_auto_skips_when_no_handler() -> None:
     """_dispatch() submits 'skip' automatically for unhandled event types."""
-    route = respx.post(f"{BASE_URL}/agent-actions/").mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
     agent = TaskAgent(api_key="avk_test")
     # No handlers registered.
     agent._dispatch(PENDING_EXECUTION_RESULT)
 
-    import json
-
     body = json.loads(route.calls.last.request.content)
     assert body["action"] == "skip"
     agent.close()
@@ -441,14 +753,15 @@ def test_dispatch_auto_skips_when_no_handler() -> None:
 @respx.mock
 def test_run_once_returns_count() -> None:
     """run_once() processes pending executions and returns the count."""
-    respx.post(f"{BASE_URL}/agents/").mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
-    respx.get(f"{BASE_URL}/agents/{AGENT_UID}/executions/").mock(
+    respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    respx.get(EXECUTIONS_URL).mock(
         return_value=httpx.Response(
             200,
             json={"results": [PENDING_EXECUTION_RESULT, PENDING_EXECUTION_TASK]},
         )
     )
-    respx.post(f"{BASE_URL}/agent-actions/").mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    single_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
 
     agent = TaskAgent(api_key="avk_test", name="test-agent")
 
@@ -462,4 +775,141 @@ def test_run_once_returns_count() -> None:
 
     count = agent.run_once()
     assert count == 2
+
+    # Both actions go out in a single bulk request.
+    assert bulk_route.call_count == 1
+    assert not single_route.called
+    body = json.loads(bulk_route.calls.last.request.content)
+    assert body == {
+        "actions": [
+            {"execution": PENDING_EXECUTION_RESULT["uid"], "action": "approve"},
+            {"execution": PENDING_EXECUTION_TASK["uid"], "action": "approve"},
+        ]
+    }
+    agent.close()
+
+
+@respx.mock
+def test_run_once_skips_execution_whose_handler_raises_after_deciding() -> None:
+    """A failing handler's queued decision is replaced by the runner's skip."""
+    respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    respx.get(EXECUTIONS_URL).mock(
+        return_value=httpx.Response(
+            200,
+            json={"results": [PENDING_EXECUTION_RESULT, PENDING_EXECUTION_TASK]},
+        )
+    )
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+
+    agent = TaskAgent(api_key="avk_test", name="test-agent")
+
+    @agent.on("result.submitted")
+    def h1(ctx):  # type: ignore[no-untyped-def]
+        ctx.approve()
+        raise RuntimeError("boom")
+
+    @agent.on("task.completed")
+    def h2(ctx):  # type: ignore[no-untyped-def]
+        ctx.approve()
+
+    assert agent.run_once() == 1
+    body = json.loads(bulk_route.calls.last.request.content)
+    assert body == {
+        "actions": [
+            {
+                "execution": PENDING_EXECUTION_RESULT["uid"],
+                "action": "skip",
+                "reason": "handler raised an unhandled exception",
+            },
+            {"execution": PENDING_EXECUTION_TASK["uid"], "action": "approve"},
+        ]
+    }
+    agent.close()
+
+
+@respx.mock
+def test_flush_batch_falls_back_to_single_actions_on_bulk_failure() -> None:
+    """_flush_batch() POSTs actions one by one if the bulk request fails."""
+    respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(404, json={}))
+    single_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    agent = TaskAgent(api_key="avk_test")
+    agent._begin_batch()
+    agent._submit_action("exec-1", "approve", "")
+    agent._submit_action("exec-2", "reject", "Blurry")
+    assert not single_route.called
+
+    agent._flush_batch()
+
+    bodies = [json.loads(call.request.content) for call in single_route.calls]
+    assert bodies == [
+        {"execution": "exec-1", "action": "approve"},
+        {"execution": "exec-2", "action": "reject", "reason": "Blurry"},
+    ]
+    assert agent._in_batch is False
+    agent.close()
+
+
+@pytest.mark.parametrize("status", [404, 405])
+@respx.mock
+def test_flush_batch_stops_using_bulk_endpoint_the_server_lacks(status: int) -> None:
+    """After a 404/405 from the bulk endpoint, later batches POST actions directly."""
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(status))
+    single_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    agent = TaskAgent(api_key="avk_test")
+
+    for uid in ("exec-1", "exec-2"):
+        agent._begin_batch()
+        agent._submit_action(uid, "approve", "")
+        agent._flush_batch()
+
+    assert bulk_route.call_count == 1
+    assert single_route.call_count == 2
+    agent.close()
+
+
+@respx.mock
+def test_flush_batch_keeps_bulk_endpoint_after_server_error() -> None:
+    """A transient bulk failure does not disable the bulk endpoint."""
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json={"status": "ok"})]
+    )
+    respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    agent = TaskAgent(api_key="avk_test")
+
+    for uid in ("exec-1", "exec-2"):
+        agent._begin_batch()
+        agent._submit_action(uid, "approve", "")
+        agent._flush_batch()
+
+    assert bulk_route.call_count == 2
+    agent.close()
+
+
+@respx.mock
+def test_flush_batch_isolates_action_that_cannot_be_encoded() -> None:
+    """A reason that is not valid JSON text loses only its own action."""
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    single_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+    agent = TaskAgent(api_key="avk_test")
+    agent._begin_batch()
+    agent._submit_action("exec-1", "reject", "bad file \ud800")
+    agent._submit_action("exec-2", "approve", "")
+
+    agent._flush_batch()
+
+    assert not bulk_route.called
+    assert [json.loads(call.request.content) for call in single_route.calls] == [
+        {"execution": "exec-2", "action": "approve"}
+    ]
+    agent.close()
+
+
+@respx.mock
+def test_flush_batch_does_nothing_when_empty() -> None:
+    """_flush_batch() sends no request when no action was queued."""
+    bulk_route = respx.post(BULK_ACTIONS_URL)
+    agent = TaskAgent(api_key="avk_test")
+    agent._begin_batch()
+    agent._flush_batch()
+    assert not bulk_route.called
     agent.close()
@@ -0,0 +1,357 @@
+"""Tests for AsyncTaskAgent."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+import respx
+
+from avala_agents import AsyncTaskAgent
+from avala_agents._exceptions import AgentActionError, AgentRegistrationError
+from tests.conftest import (
+    ACTIONS_URL,
+    AGENTS_URL,
+    BULK_ACTIONS_URL,
+    EXECUTIONS_URL,
+    PENDING_EXECUTION_RESULT,
+    PENDING_EXECUTION_TASK,
+    REGISTER_RESPONSE,
+)
+
+AGENT_UID = REGISTER_RESPONSE["uid"]
+
+
+def _close(agent: AsyncTaskAgent) -> None:
+    asyncio.run(agent.aclose())
+
+
+# ---------------------------------------------------------------------------
+# Instantiation
+# ---------------------------------------------------------------------------
+
+
+def test_async_agent_requires_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    """AsyncTaskAgent raises ValueError when no API key is available."""
+    monkeypatch.delenv("AVALA_API_KEY", raising=False)
+    with pytest.raises(ValueError, match="No API key"):
+        AsyncTaskAgent()
+
+
+def test_async_agent_context_manager() -> None:
+    """AsyncTaskAgent works as an async context manager."""
+
+    async def main() -> None:
+        async with AsyncTaskAgent(api_key="avk_test") as agent:
+            assert agent.name == "default-agent"
+        assert agent._http.is_closed
+
+    asyncio.run(main())
+
+
+def test_async_agent_keepalive_outlives_poll_interval() -> None:
+    """Idle connections are kept for longer than the poll interval."""
+    agent = AsyncTaskAgent(api_key="avk_test", poll_interval=60.0)
+    limits = agent._client_kwargs["limits"]
+    assert limits.keepalive_expiry is not None
+    assert limits.keepalive_expiry > 60.0
+    _close(agent)
+
+
+# ---------------------------------------------------------------------------
+# Registration and fetching
+# ---------------------------------------------------------------------------
+
+
+@respx.mock
+def test_register_posts_to_agents_endpoint() -> None:
+    """_register() POSTs to /agents/ and stores the returned uid."""
+    route = respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    agent = AsyncTaskAgent(api_key="avk_test", name="test-agent")
+    asyncio.run(agent._register())
+
+    assert route.called
+    assert agent._agent_uid == AGENT_UID
+    _close(agent)
+
+
+@respx.mock
+def test_register_raises_on_server_error() -> None:
+    """_register() raises AgentRegistrationError on non-2xx response."""
+    respx.post(AGENTS_URL).mock(return_value=httpx.Response(500, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+    with pytest.raises(AgentRegistrationError, match="HTTP 500"):
+        asyncio.run(agent._register())
+    _close(agent)
+
+
+@respx.mock
+def test_fetch_pending_executions_returns_list() -> None:
+    """_fetch_pending_executions() returns a list of execution dicts."""
+    agent = AsyncTaskAgent(api_key="avk_test")
+    agent._agent_uid = AGENT_UID
+    respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, json={"results": [PENDING_EXECUTION_RESULT]}))
+
+    executions = asyncio.run(agent._fetch_pending_executions())
+    assert [e["uid"] for e in executions] == [PENDING_EXECUTION_RESULT["uid"]]
+    _close(agent)
+
+
+@respx.mock
+def test_fetch_pending_executions_returns_empty_on_error() -> None:
+    """_fetch_pending_executions() returns [] on a server error (no exception)."""
+    agent = AsyncTaskAgent(api_key="avk_test")
+    agent._agent_uid = AGENT_UID
+    respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(503, json={}))
+
+    assert asyncio.run(agent._fetch_pending_executions()) == []
+    _close(agent)
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+
+def test_on_records_whether_handler_is_a_coroutine_function() -> None:
+    """on() classifies the handler once, so dispatch does not inspect it."""
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    @agent.on("result.submitted")
+    async def async_handler(ctx):  # type: ignore[no-untyped-def]
+        pass
+
+    @agent.on("task.completed")
+    def sync_handler(ctx):  # type: ignore[no-untyped-def]
+        pass
+
+    assert agent._routes["result.submitted"][2] is True
+    assert agent._routes["task.completed"][2] is False
+    _close(agent)
+
+
+@respx.mock
+def test_dispatch_awaits_async_handler_and_submits_action() -> None:
+    """_dispatch() awaits coroutine handlers and POSTs the recorded action."""
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    @agent.on("result.submitted")
+    async def handler(ctx):  # type: ignore[no-untyped-def]
+        ctx.reject("Too blurry")
+
+    asyncio.run(agent._dispatch(PENDING_EXECUTION_RESULT))
+
+    body = json.loads(route.calls.last.request.content)
+    assert body == {
+        "execution": PENDING_EXECUTION_RESULT["uid"],
+        "action": "reject",
+        "reason": "Too blurry",
+    }
+    assert agent._pending_actions == {}
+    _close(agent)
+
+
+@respx.mock
+def test_dispatch_accepts_sync_handler() -> None:
+    """_dispatch() also supports plain (non-async) handlers."""
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    @agent.on("task.completed")
+    def handler(ctx):  # type: ignore[no-untyped-def]
+        ctx.approve()
+
+    asyncio.run(agent._dispatch(PENDING_EXECUTION_TASK))
+
+    assert json.loads(route.calls.last.request.content)["action"] == "approve"
+    _close(agent)
+
+
+@respx.mock
+def test_dispatch_discards_actions_when_handler_raises() -> None:
+    """Actions recorded before a handler raises are not submitted."""
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    @agent.on("result.submitted")
+    async def handler(ctx):  # type: ignore[no-untyped-def]
+        ctx.approve()
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(agent._dispatch(PENDING_EXECUTION_RESULT))
+
+    assert not route.called
+    assert agent._pending_actions == {}
+    _close(agent)
+
+
+@respx.mock
+def test_action_taken_after_handler_returns_is_dropped(caplog: pytest.LogCaptureFixture) -> None:
+    """A context kept past its handler warns instead of leaking the action."""
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+    contexts = []
+
+    @agent.on("result.submitted")
+    async def handler(ctx):  # type: ignore[no-untyped-def]
+        contexts.append(ctx)
+
+    asyncio.run(agent._dispatch(PENDING_EXECUTION_RESULT))
+    contexts[0].approve()
+
+    assert not route.called
+    assert agent._pending_actions == {}
+    assert "no longer running" in caplog.text
+    _close(agent)
+
+
+@respx.mock
+def test_dispatch_auto_skips_when_no_handler() -> None:
+    """_dispatch() submits 'skip' automatically for unhandled event types."""
+    route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    asyncio.run(agent._dispatch(PENDING_EXECUTION_RESULT))
+
+    assert json.loads(route.calls.last.request.content)["action"] == "skip"
+    _close(agent)
+
+
+@respx.mock
+def test_post_action_raises_on_server_error() -> None:
+    """_post_action() raises AgentActionError on non-2xx response."""
+    respx.post(ACTIONS_URL).mock(return_value=httpx.Response(400, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+    with pytest.raises(AgentActionError, match="HTTP 400"):
+        asyncio.run(agent._post_action(PENDING_EXECUTION_RESULT["uid"], "approve", ""))
+    _close(agent)
+
+
+@respx.mock
+def test_dispatch_runs_sync_handler_in_worker_thread() -> None:
+    """Plain handlers run off the event loop thread."""
+    respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+    threads: list[int] = []
+
+    @agent.on("task.completed")
+    def handler(ctx):  # type: ignore[no-untyped-def]
+        threads.append(threading.get_ident())
+        ctx.approve()
+
+    asyncio.run(agent._dispatch(PENDING_EXECUTION_TASK))
+
+    assert threads and threads[0] != threading.get_ident()
+    _close(agent)
+
+
+# ---------------------------------------------------------------------------
+# run_once integration
+# ---------------------------------------------------------------------------
+
+
+@respx.mock
+def test_run_once_returns_count() -> None:
+    """run_once() processes pending executions and returns the count."""
+    respx.post(AGENTS_URL).mock(return_value=httpx.Response(201, json=REGISTER_RESPONSE))
+    respx.get(EXECUTIONS_URL).mock(
+        return_value=httpx.Response(200, json={"results": [PENDING_EXECUTION_RESULT, PENDING_EXECUTION_TASK]})
+    )
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+
+    agent = AsyncTaskAgent(api_key="avk_test", name="test-agent")
+
+    @agent.on("result.submitted")
+    async def h1(ctx):  # type: ignore[no-untyped-def]
+        ctx.approve()
+
+    @agent.on("task.completed")
+    def h2(ctx):  # type: ignore[no-untyped-def]
+        ctx.approve()
+
+    async def main() -> int:
+        async with agent:
+            return await agent.run_once()
+
+    assert asyncio.run(main()) == 2
+    assert bulk_route.call_count == 1
+    assert len(json.loads(bulk_route.calls.last.request.content)["actions"]) == 2
+
+
+@respx.mock
+def test_run_once_does_not_long_poll() -> None:
+    """run_once() takes a snapshot even when the server supports long polls."""
+    respx.post(AGENTS_URL).mock(
+        return_value=httpx.Response(201, json=REGISTER_RESPONSE, headers={"X-Avala-Long-Poll": "true"})
+    )
+    route = respx.get(EXECUTIONS_URL).mock(return_value=httpx.Response(200, json={"results": []}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    async def main() -> int:
+        async with agent:
+            return await agent.run_once()
+
+    assert asyncio.run(main()) == 0
+    assert "wait" not in route.calls.last.request.url.params
+    assert agent._long_poll is True
+
+
+@respx.mock
+def test_flush_batch_falls_back_to_single_actions_on_bulk_failure() -> None:
+    """_flush_batch() POSTs actions one by one if the bulk request fails."""
+    respx.post(BULK_ACTIONS_URL).mock(side_effect=httpx.ConnectError("down"))
+    single_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    async def main() -> None:
+        agent._begin_batch()
+        await agent._queue_action("exec-1", "approve", "")
+        await agent._queue_action("exec-2", "skip", "")
+        await agent._flush_batch()
+
+    asyncio.run(main())
+    assert single_route.call_count == 2
+    _close(agent)
+
+
+@respx.mock
+def test_flush_batch_stops_using_bulk_endpoint_the_server_lacks() -> None:
+    """After a 405 from the bulk endpoint, later batches POST actions directly."""
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(405))
+    single_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    async def main() -> None:
+        for uid in ("exec-1", "exec-2"):
+            agent._begin_batch()
+            await agent._queue_action(uid, "approve", "")
+            await agent._flush_batch()
+
+    asyncio.run(main())
+    assert bulk_route.call_count == 1
+    assert single_route.call_count == 2
+    _close(agent)
+
+
+@respx.mock
+def test_flush_batch_isolates_action_that_cannot_be_encoded() -> None:
+    """A reason that is not valid JSON text loses only its own action."""
+    bulk_route = respx.post(BULK_ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    single_route = respx.post(ACTIONS_URL).mock(return_value=httpx.Response(200, json={}))
+    agent = AsyncTaskAgent(api_key="avk_test")
+
+    async def main() -> None:
+        agent._begin_batch()
+        await agent._queue_action("exec-1", "reject", "bad file \ud800")
+        await agent._queue_action("exec-2", "approve", "")
+        await agent._flush_batch()
+
+    asyncio.run(main())
+    assert not bulk_route.called
+    assert [json.loads(call.request.content)["execution"] for call in single_route.calls] == ["exec-2"]
+    _close(agent)
@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock
+import dataclasses
+from types import SimpleNamespace
+from unittest.mock import Mock
 
 import pytest
 
 from avala_agents._context import EventContext, ResultContext, TaskContext
 
 
+def _stub_agent() -> SimpleNamespace:
+    # Contexts only need _submit_action (see _ActionSubmitter).
+    return SimpleNamespace(_submit_action=Mock(return_value=None))
+
+
 def _make_result_context(**kwargs: object) -> ResultContext:
     defaults = dict(
         execution_uid="exec-001",
@@ -20,7 +27,7 @@ def _make_result_context(**kwargs: object) -> ResultContext:
         task_name="Test task",
         task_type="bounding_box",
         project_uid="proj-001",
-        _agent=MagicMock(),
+        _agent=_stub_agent(),
     )
     defaults.update(kwargs)
     return ResultContext(**defaults)  # type: ignore[arg-type]
@@ -35,7 +42,7 @@ def _make_task_context(**kwargs: object) -> TaskContext:
         task_type="bounding_box",
         task_status="completed",
         project_uid="proj-001",
-        _agent=MagicMock(),
+        _agent=_stub_agent(),
     )
     defaults.update(kwargs)
     return TaskContext(**defaults)  # type: ignore[arg-type]
@@ -125,7 +132,7 @@ def _make_event_context(**kwargs: object) -> EventContext:
         resource_type="dataset",
         project_uid="proj-001",
         payload={"dataset_uid": "ds-001", "project_uid": "proj-001"},
-        _agent=MagicMock(),
+        _agent=_stub_agent(),
     )
     defaults.update(kwargs)
     return EventContext(**defaults)  # type: ignore[arg-type]
@@ -168,3 +175,31 @@ class TestEventContext:
         ctx = _make_event_context(resource_uid=None, resource_type=None)
         assert ctx.resource_uid is None
         assert ctx.resource_type is None
+
+
+# ---------------------------------------------------------------------------
+# Memory layout
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("factory", [_make_result_context, _make_task_context, _make_event_context])
+def test_contexts_use_slots(factory) -> None:  # type: ignore[no-untyped-def]
+    """Contexts are slotted and carry no per-instance __dict__."""
+    ctx = factory()
+    assert not hasattr(ctx, "__dict__")
+    with pytest.raises(AttributeError):
+        ctx.unexpected = 1
+
+
+@pytest.mark.parametrize("cls", [ResultContext, TaskContext, EventContext])
+def test_context_slots_match_fields(cls: type) -> None:
+    """The hand-written __slots__ list every dataclass field."""
+    assert sorted(cls.__slots__) == sorted(f.name for f in dataclasses.fields(cls))
+
+
+def test_context_repr_omits_agent() -> None:
+    ctx = _make_task_context()
+    assert repr(ctx) == (
+        "TaskContext(execution_uid='exec-002', event_type='task.completed', task_uid='task-002', "
+        "task_name='Test task', task_type='bounding_box', task_status='completed', project_uid='proj-001')"
+    )
@@ -0,0 +1,71 @@
+"""Tests for the _json encoding helpers."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+
+import pytest
+
+from avala_agents import _json
+
+
+def test_dumps_returns_compact_bytes() -> None:
+    encoded = _json.dumps({"execution": "exec-001", "action": "approve"})
+    assert encoded == b'{"execution":"exec-001","action":"approve"}'
+
+
+def test_round_trip_preserves_nested_payload() -> None:
+    payload = {"results": [{"result_data": [{"label": "café", "bbox": [10, 20, 100, 200]}]}]}
+    assert _json.loads(_json.dumps(payload)) == payload
+
+
+def test_loads_rejects_invalid_json() -> None:
+    with pytest.raises(ValueError):
+        _json.loads(b"{not json")
+
+
+def test_stdlib_fallback_when_orjson_missing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without orjson the helpers fall back to the standard library."""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    fallback = importlib.reload(_json)
+    try:
+        assert fallback.dumps({"a": [1, "é"]}) == '{"a":[1,"é"]}'.encode()
+        assert fallback.loads(b'{"a": 1}') == {"a": 1}
+    finally:
+        monkeypatch.undo()
+        importlib.reload(_json)
+
+
+def _feed_all(chunks: list[bytes]) -> list[dict]:
+    parser = _json.ExecutionParser()
+    items: list[dict] = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    return items
+
+
+@pytest.mark.skipif(not _json.STREAMING_AVAILABLE, reason="requires ijson")
+def test_execution_parser_yields_items_as_they_complete() -> None:
+    parser = _json.ExecutionParser()
+    assert parser.feed(b'  {"results": [{"uid": "e1", "score": 0.5}, {"ui') == [{"uid": "e1", "score": 0.5}]
+    assert parser.feed(b'd": "e2"}], "next": null}') == [{"uid": "e2"}]
+    assert parser.close() == []
+
+
+@pytest.mark.skipif(not _json.STREAMING_AVAILABLE, reason="requires ijson")
+def test_execution_parser_accepts_bare_list() -> None:
+    assert _feed_all([b"[", b'{"uid": "e1"}', b"]"]) == [{"uid": "e1"}]
+
+
+@pytest.mark.skipif(not _json.STREAMING_AVAILABLE, reason="requires ijson")
+def test_execution_parser_keeps_floats() -> None:
+    (item,) = _feed_all([b'[{"confidence": 0.95}]'])
+    assert type(item["confidence"]) is float
+
+
+@pytest.mark.skipif(not _json.STREAMING_AVAILABLE, reason="requires ijson")
+def test_execution_parser_rejects_truncated_body() -> None:
+    with pytest.raises(ValueError):
+        _feed_all([b'{"results": [{"uid": "e1"'])
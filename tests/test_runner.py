@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from avala_agents._runner import AsyncPollingRunner, PollingRunner, _idle_delay
 
 
 def _make_runner(executions: list[dict], *, poll_interval: float = 5.0):  # type: ignore[return]
     """Return a PollingRunner wired to a mock agent."""
-    from avala_agents._runner import PollingRunner
-
     agent = MagicMock()
     agent.name = "test-agent"
     agent._fetch_pending_executions.return_value = executions
+    agent._iter_pending_executions.side_effect = lambda: iter(executions)
     runner = PollingRunner(agent, poll_interval=poll_interval)
     return runner, agent
 
@@ -50,6 +55,23 @@ def test_run_once_continues_after_dispatch_exception() -> None:
     assert agent._dispatch.call_count == 2
 
 
+def test_run_once_wraps_dispatch_in_a_batch() -> None:
+    """Actions taken during one poll are flushed together afterwards."""
+    runner, agent = _make_runner([{"uid": "e1"}, {"uid": "e2"}])
+    runner.run_once()
+    names = [name for name, _, _ in agent.method_calls if name in {"_begin_batch", "_dispatch", "_flush_batch"}]
+    assert names == ["_begin_batch", "_dispatch", "_dispatch", "_flush_batch"]
+
+
+def test_run_once_flushes_batch_when_dispatch_raises() -> None:
+    """The skip for a failing execution is queued and flushed with the rest."""
+    runner, agent = _make_runner([{"uid": "e1"}])
+    agent._dispatch.side_effect = RuntimeError("oops")
+    runner.run_once()
+    agent._submit_action.assert_called_once_with("e1", "skip", "handler raised an unhandled exception")
+    agent._flush_batch.assert_called_once_with()
+
+
 def test_stop_sets_running_false() -> None:
     runner, _ = _make_runner([])
     runner._running = True
@@ -59,21 +81,291 @@ def test_stop_sets_running_false() -> None:
 
 def test_run_stops_on_keyboard_interrupt() -> None:
     """run() should exit cleanly on KeyboardInterrupt."""
-    from avala_agents._runner import PollingRunner
+    runner, agent = _make_runner([], poll_interval=0.0)
+    agent._fetch_pending_executions.side_effect = KeyboardInterrupt
+
+    # Should not propagate KeyboardInterrupt.
+    runner.run()
+    assert agent._fetch_pending_executions.call_count == 1
+    assert runner._running is False
+
+
+def test_run_prefetches_next_batch_during_dispatch() -> None:
+    """The next fetch runs while the current batch is being dispatched."""
+    runner, agent = _make_runner([], poll_interval=0.0)
+    agent._fetch_failed = False
+    agent._long_poll = False
+    batches = iter([[{"uid": "e1"}], [{"uid": "e2"}]])
+    second_fetch = threading.Event()
+
+    def fetch() -> list[dict]:
+        batch = next(batches, None)
+        if batch is None:
+            runner.stop()
+            return []
+        if batch[0]["uid"] == "e2":
+            second_fetch.set()
+        return batch
+
+    overlapped: list[bool] = []
+
+    def dispatch(execution: dict) -> None:
+        if execution["uid"] == "e1":
+            overlapped.append(second_fetch.wait(timeout=5))
+
+    agent._fetch_pending_executions.side_effect = fetch
+    agent._dispatch.side_effect = dispatch
+    runner.run()
+
+    assert overlapped == [True]
+    assert [c.args[0]["uid"] for c in agent._dispatch.call_args_list] == ["e1", "e2"]
+
+
+def test_run_prefetches_in_daemon_thread() -> None:
+    """An in-flight prefetch does not keep the interpreter alive at exit."""
+    runner, agent = _make_runner([], poll_interval=0.0)
+    daemon: list[bool] = []
+
+    def fetch() -> list[dict]:
+        if agent._fetch_pending_executions.call_count == 1:
+            return [{"uid": "e1"}]
+        daemon.append(threading.current_thread().daemon)
+        runner.stop()
+        return []
+
+    agent._fetch_pending_executions.side_effect = fetch
+    runner.run()
+
+    assert daemon == [True]
+
+
+def test_run_processes_prefetched_batch_after_stop() -> None:
+    """Executions fetched before stop() are still dispatched."""
+    runner, agent = _make_runner([], poll_interval=0.0)
+    agent._fetch_pending_executions.side_effect = [[{"uid": "e1"}], [{"uid": "e2"}]]
+    agent._dispatch.side_effect = lambda execution: runner.stop()
+
+    runner.run()
+
+    assert agent._dispatch.call_count == 2
+    assert agent._fetch_pending_executions.call_count == 2
+
+
+def test_run_backs_off_over_consecutive_empty_polls() -> None:
+    """The idle wait grows by 1.5x up to max_poll_interval and resets on work."""
+    runner, agent = _make_runner([])
+    runner = PollingRunner(agent, poll_interval=2.0, max_poll_interval=5.0)
+    agent._fetch_failed = False
+    agent._long_poll = False
+    agent._fetch_pending_executions.side_effect = [[], [], [], [], [{"uid": "e1"}], [], []]
+    waits: list[float] = []
+
+    def wait(delay: float) -> bool:
+        waits.append(delay)
+        if len(waits) == 5:
+            runner.stop()
+        return False
+
+    runner._stop_event.wait = wait  # type: ignore[method-assign]
+    runner.run()
+
+    assert waits == [2.0, 3.0, 4.5, 5.0, 2.0]
+
+
+def test_stop_interrupts_idle_wait() -> None:
+    """stop() from another thread ends the wait between polls at once."""
+    runner, agent = _make_runner([], poll_interval=60.0)
+    agent._fetch_failed = False
+    agent._long_poll = False
+    thread = threading.Thread(target=runner.run)
+    thread.start()
+    while not agent._fetch_pending_executions.called:
+        pass
+    runner.stop()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+
+
+def test_idle_delay_waits_poll_interval_after_empty_short_poll() -> None:
+    agent = MagicMock(_fetch_failed=False, _long_poll=False)
+    assert _idle_delay(agent, 5.0) == 5.0
+
 
+def test_idle_delay_repolls_immediately_when_long_polling() -> None:
+    agent = MagicMock(_fetch_failed=False, _long_poll=True)
+    assert _idle_delay(agent, 5.0) == 0.0
+
+
+def test_idle_delay_backs_off_with_jitter_after_failed_fetch() -> None:
+    agent = MagicMock(_fetch_failed=True, _long_poll=True)
+    delays = {_idle_delay(agent, 4.0) for _ in range(20)}
+    assert all(4.0 <= d <= 6.0 for d in delays)
+    assert len(delays) > 1
+
+
+# ---------------------------------------------------------------------------
+# AsyncPollingRunner
+# ---------------------------------------------------------------------------
+
+
+async def _aiter(executions: list[dict]):  # type: ignore[no-untyped-def]
+    for execution in executions:
+        yield execution
+
+
+def _make_async_runner(executions: list[dict], *, poll_interval: float = 5.0):  # type: ignore[return]
+    """Return an AsyncPollingRunner wired to a mock async agent."""
     agent = MagicMock()
     agent.name = "test-agent"
-    call_count = 0
+    agent._fetch_pending_executions = AsyncMock(return_value=executions)
+    agent._iter_pending_executions.side_effect = lambda: _aiter(executions)
+    agent._dispatch = AsyncMock()
+    agent._queue_action = AsyncMock()
+    agent._flush_batch = AsyncMock()
+    runner = AsyncPollingRunner(agent, poll_interval=poll_interval)
+    return runner, agent
 
-    def fake_run_once() -> int:
-        nonlocal call_count
-        call_count += 1
-        raise KeyboardInterrupt
 
-    runner = PollingRunner(agent, poll_interval=0.0)
-    runner.run_once = fake_run_once  # type: ignore[method-assign]
+def test_async_run_once_returns_count_of_processed_executions() -> None:
+    runner, agent = _make_async_runner([{"uid": "e1"}, {"uid": "e2"}])
+    assert asyncio.run(runner.run_once()) == 2
+    assert agent._dispatch.await_count == 2
 
-    # Should not propagate KeyboardInterrupt.
-    runner.run()
-    assert call_count == 1
+
+def test_async_run_once_skips_execution_after_dispatch_exception() -> None:
+    """A failing dispatch is skipped and does not abort the rest."""
+    runner, agent = _make_async_runner([{"uid": "e1"}, {"uid": "e2"}])
+    agent._dispatch.side_effect = [RuntimeError("oops"), None]
+
+    assert asyncio.run(runner.run_once()) == 1
+    assert agent._dispatch.await_count == 2
+    agent._queue_action.assert_awaited_once_with("e1", "skip", "handler raised an unhandled exception")
+
+
+def test_async_run_once_finishes_started_dispatches_when_page_breaks_off() -> None:
+    """Executions parsed before a mid-stream error still complete and are flushed."""
+    runner, agent = _make_async_runner([])
+    finished: list[str] = []
+
+    async def broken_page():  # type: ignore[no-untyped-def]
+        yield {"uid": "e1"}
+        yield {"uid": "e2"}
+        raise ValueError("truncated body")
+
+    async def dispatch(execution: dict) -> None:
+        await asyncio.sleep(0)
+        finished.append(execution["uid"])
+
+    agent._iter_pending_executions.side_effect = broken_page
+    agent._dispatch.side_effect = dispatch
+
+    with pytest.raises(ValueError, match="truncated"):
+        asyncio.run(runner.run_once())
+    assert finished == ["e1", "e2"]
+    agent._flush_batch.assert_awaited_once_with()
+
+
+def test_async_run_once_flushes_batch() -> None:
+    runner, agent = _make_async_runner([{"uid": "e1"}])
+    asyncio.run(runner.run_once())
+    agent._begin_batch.assert_called_once_with()
+    agent._flush_batch.assert_awaited_once_with()
+
+
+def test_async_run_stops_when_stop_called() -> None:
+    """run() returns once stop() is called."""
+    runner, agent = _make_async_runner([], poll_interval=0.0)
+
+    async def fetch_and_stop() -> list[dict]:
+        runner.stop()
+        return []
+
+    agent._fetch_pending_executions.side_effect = fetch_and_stop
+    asyncio.run(runner.run())
+    assert agent._fetch_pending_executions.await_count == 1
+    assert runner._running is False
+
+
+def test_async_run_once_dispatches_concurrently() -> None:
+    """Executions from one poll are dispatched at the same time."""
+    runner, agent = _make_async_runner([{"uid": "e1"}, {"uid": "e2"}])
+    started: list[str] = []
+
+    async def dispatch(execution: dict) -> None:
+        started.append(execution["uid"])
+        # Each dispatch waits until both have started; a serial
+        # runner would never get past the first one.
+        while len(started) < 2:
+            await asyncio.sleep(0)
+
+    agent._dispatch.side_effect = dispatch
+    assert asyncio.run(asyncio.wait_for(runner.run_once(), timeout=1.0)) == 2
+
+
+def test_async_run_once_caps_concurrency() -> None:
+    """No more than max_concurrency dispatches run at once."""
+    runner, agent = _make_async_runner([{"uid": f"e{i}"} for i in range(6)])
+    runner = AsyncPollingRunner(agent, max_concurrency=2)
+    active = 0
+    peak = 0
+
+    async def dispatch(execution: dict) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+
+    agent._dispatch.side_effect = dispatch
+    assert asyncio.run(runner.run_once()) == 6
+    assert peak == 2
+
+
+def test_async_run_prefetches_next_batch_during_dispatch() -> None:
+    """The next fetch is in flight while the current batch is dispatched."""
+    runner, agent = _make_async_runner([], poll_interval=0.0)
+    batches = iter([[{"uid": "e1"}], [{"uid": "e2"}]])
+    overlapped: list[bool] = []
+
+    async def main() -> None:
+        second_fetch = asyncio.Event()
+
+        async def fetch() -> list[dict]:
+            batch = next(batches, None)
+            if batch is None:
+                runner.stop()
+                return []
+            if batch[0]["uid"] == "e2":
+                second_fetch.set()
+            return batch
+
+        async def dispatch(execution: dict) -> None:
+            if execution["uid"] == "e1":
+                await asyncio.wait_for(second_fetch.wait(), timeout=5)
+                overlapped.append(True)
+
+        agent._fetch_pending_executions.side_effect = fetch
+        agent._dispatch.side_effect = dispatch
+        await runner.run()
+
+    asyncio.run(main())
+    assert overlapped == [True]
+    assert agent._dispatch.await_count == 2
+
+
+def test_async_stop_interrupts_idle_wait() -> None:
+    """stop() ends the wait between polls at once."""
+    runner, agent = _make_async_runner([], poll_interval=60.0)
+    agent._fetch_failed = False
+    agent._long_poll = False
+
+    async def main() -> None:
+        task = asyncio.ensure_future(runner.run())
+        while not agent._fetch_pending_executions.await_count:
+            await asyncio.sleep(0)
+        runner.stop()
+        await asyncio.wait_for(task, timeout=5)
+
+    asyncio.run(main())
     assert runner._running is False
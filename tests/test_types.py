@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 from avala_agents._types import (
+    _AGENT_EVENT_SET,
+    _CATEGORY_BY_PREFIX,
     AGENT_EVENTS,
     DATASET_EVENTS,
     EXPORT_EVENTS,
@@ -47,6 +49,15 @@ def test_result_and_task_events_are_disjoint() -> None:
     assert RESULT_EVENTS.isdisjoint(TASK_EVENTS)
 
 
+def test_category_by_prefix_agrees_with_event_sets() -> None:
+    def category(event: str) -> str:
+        return _CATEGORY_BY_PREFIX[event.partition(".")[0]]
+
+    assert {e for e in AGENT_EVENTS if category(e) == "result"} == RESULT_EVENTS
+    assert {e for e in AGENT_EVENTS if category(e) == "task"} == TASK_EVENTS
+    assert {e for e in AGENT_EVENTS if category(e) == "resource"} == DATASET_EVENTS | EXPORT_EVENTS
+
+
 def test_agent_event_dataclass() -> None:
     event = AgentEvent(
         execution_uid="exec-001",
@@ -56,3 +67,14 @@ def test_agent_event_dataclass() -> None:
     assert event.execution_uid == "exec-001"
     assert event.event_type == "result.submitted"
     assert event.payload == {"key": "value"}
+
+
+def test_agent_event_unpacks_as_tuple() -> None:
+    event = AgentEvent("exec-001", "task.completed", {})
+    execution_uid, event_type, payload = event
+    assert (execution_uid, event_type, payload) == ("exec-001", "task.completed", {})
+    assert not hasattr(event, "__dict__")
+
+
+def test_agent_event_set_matches_agent_events() -> None:
+    assert _AGENT_EVENT_SET == frozenset(AGENT_EVENTS)